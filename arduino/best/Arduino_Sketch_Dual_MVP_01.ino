@@ -6,6 +6,77 @@
 Adafruit_MPU6050 mpu1; // First MPU-6050 (0x68)
 Adafruit_MPU6050 mpu2; // Second MPU-6050 (0x69)
 
+// Set to 1 to stream compact binary frames instead of CSV text.
+// The frame layout must match src/utils/frame_protocol.py on the host.
+#define BINARY_FRAMES 0
+
+// Set to 1, together with BINARY_FRAMES, to stream raw accelerometer and
+// gyroscope readings and let the host compute roll, pitch and a real yaw.
+#define RAW_IMU 0
+
+const uint8_t FRAME_SYNC_1 = 0xA5;
+const uint8_t FRAME_SYNC_2 = 0x5A;
+const uint8_t FRAME_VERSION = 1;
+const uint8_t KIND_ORIENTATION = 0;
+const uint8_t KIND_RAW = 1;
+const float FRAME_SCALE = 100.0; // Hundredths of a degree
+// Raw frames: hundredths of m/s^2 for acceleration, thousandths of rad/s for rotation
+const float RAW_SCALES[12] = {100.0, 100.0, 100.0, 1000.0, 1000.0, 1000.0,
+                              100.0, 100.0, 100.0, 1000.0, 1000.0, 1000.0};
+
+uint16_t frameSeq = 0;
+
+// CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF)
+uint16_t crc16(const uint8_t *data, size_t len) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+// Frame: sync(2) version(1) kind(1) seq(2) timestamp(4) count(1) values(2*count) crc(2), little-endian
+// Each value is sent as round(value * scales[i]).
+void sendFrame(uint8_t kind, const float *values, uint8_t count, const float *scales) {
+  uint8_t frame[11 + 2 * 12 + 2];
+  size_t n = 0;
+  uint32_t timestamp = millis();
+
+  frame[n++] = FRAME_SYNC_1;
+  frame[n++] = FRAME_SYNC_2;
+  frame[n++] = FRAME_VERSION;
+  frame[n++] = kind;
+  frame[n++] = frameSeq & 0xFF;
+  frame[n++] = frameSeq >> 8;
+  for (uint8_t i = 0; i < 4; i++) {
+    frame[n++] = (timestamp >> (8 * i)) & 0xFF;
+  }
+  frame[n++] = count;
+  for (uint8_t i = 0; i < count; i++) {
+    long fixed = lround(values[i] * scales[i]);
+    int16_t value = (int16_t)constrain(fixed, -32768L, 32767L);
+    frame[n++] = value & 0xFF;
+    frame[n++] = (value >> 8) & 0xFF;
+  }
+  uint16_t crc = crc16(frame + 2, n - 2);
+  frame[n++] = crc & 0xFF;
+  frame[n++] = crc >> 8;
+
+  Serial.write(frame, n);
+  frameSeq++;
+}
+
+void sendFrame(uint8_t kind, const float *values, uint8_t count, float scale) {
+  float scales[12];
+  for (uint8_t i = 0; i < count; i++) {
+    scales[i] = scale;
+  }
+  sendFrame(kind, values, count, scales);
+}
+
 void setup() {
   Serial.begin(115200);
   while (!Serial) {
@@ -39,6 +110,18 @@ void loop() {
   // Read data from the second MPU-6050
   mpu2.getEvent(&accel2, &gyro2, &temp2);
 
+#if BINARY_FRAMES && RAW_IMU
+  float raw[12] = {
+    accel1.acceleration.x, accel1.acceleration.y, accel1.acceleration.z,
+    gyro1.gyro.x, gyro1.gyro.y, gyro1.gyro.z,
+    accel2.acceleration.x, accel2.acceleration.y, accel2.acceleration.z,
+    gyro2.gyro.x, gyro2.gyro.y, gyro2.gyro.z,
+  };
+  sendFrame(KIND_RAW, raw, 12, RAW_SCALES);
+  delay(10);
+  return;
+#endif
+
   // Calculate roll, pitch, and yaw for the first sensor
   float roll1 = atan2(accel1.acceleration.y, accel1.acceleration.z) * 180 / M_PI;
   float pitch1 = atan2(-accel1.acceleration.x, sqrt(accel1.acceleration.y * accel1.acceleration.y + accel1.acceleration.z * accel1.acceleration.z)) * 180 / M_PI;
@@ -49,6 +132,10 @@ void loop() {
   float pitch2 = atan2(-accel2.acceleration.x, sqrt(accel2.acceleration.y * accel2.acceleration.y + accel2.acceleration.z * accel2.acceleration.z)) * 180 / M_PI;
   float yaw2 = gyro2.gyro.z * 180 / M_PI; // Simplistic yaw approximation
 
+#if BINARY_FRAMES
+  float values[6] = {roll1, pitch1, yaw1, roll2, pitch2, yaw2};
+  sendFrame(KIND_ORIENTATION, values, 6, FRAME_SCALE);
+#else
   // Print data in CSV format: roll1,pitch1,yaw1,roll2,pitch2,yaw2
   Serial.print(roll1, 2); Serial.print(",");
   Serial.print(pitch1, 2); Serial.print(",");
@@ -56,6 +143,7 @@ void loop() {
   Serial.print(roll2, 2); Serial.print(",");
   Serial.print(pitch2, 2); Serial.print(",");
   Serial.println(yaw2, 2);
+#endif
 
   // Adjust loop speed if necessary
   delay(10); // 10ms delay gives ~100Hz output rate
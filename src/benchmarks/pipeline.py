@@ -0,0 +1,194 @@
+"""Benchmarks the live pipeline with synthetic IMU byte streams.
+
+Each configuration streams a few seconds of samples at a given rate and
+channel count through the same stages as the app, one 10ms drain tick at a
+time: parsing (SerialSource.feed) into the device's ring buffer, acquiring
+(AcquisitionManager.read: draining the ring, resampling onto the 100Hz grid
+and deriving joint angles), publishing to the live ring, scoring
+(MobilityTest) and redrawing the plot (DataTab.render_plot, at 30 frames per
+second). Bytes are stamped with the tick they arrive in rather than the
+clock, so every stage sees as many samples as in real time however fast the
+benchmark runs. Reports throughput, per-tick latency percentiles for each
+stage and peak traced memory. Runs headless:
+
+    cd src && python -m benchmarks.pipeline
+    python -m benchmarks.pipeline --rates 1000 --channels 12 --protocols binary --json results.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from utils.acquisition import AcquisitionManager
+from utils.frame_protocol import encode_frame
+from utils.latency import LatencyMonitor
+from utils.scoring import MobilityTest
+from utils.shared_ring import SharedRing
+from utils.sources import SampleReader, SerialSource
+
+TICK = 0.01  # Seconds of samples per drain, as SerialTab's timer
+FRAME_INTERVAL = 1 / 30  # Seconds between plot redraws at the default max_fps
+RESAMPLE_RATE = 100.0  # As the main window's AcquisitionManager
+STAGES = ['parse', 'acquire', 'publish', 'score', 'render']
+
+
+def synthetic_stream(protocol, rate, num_values, seconds, seed=0):
+    """Returns one bytes chunk per tick of a board streaming joint-like motion."""
+    count = int(rate * seconds)
+    rng = np.random.default_rng(seed)
+    times = np.arange(count) / rate
+    values = 45 * np.sin(2 * np.pi * rng.uniform(0.1, 1.0, num_values) * times[:, None]) + rng.normal(0, 0.5, (count, num_values))
+
+    if protocol == 'binary':
+        messages = [encode_frame(i, int(times[i] * 1000), values[i]) for i in range(count)]
+    else:
+        messages = [(','.join(f"{v:.2f}" for v in row) + '\n').encode() for row in values]
+    per_tick = max(1, int(rate * TICK))
+    return [b''.join(messages[i:i + per_tick]) for i in range(0, count, per_tick)]
+
+
+class BenchmarkReader(SampleReader):
+    """A device reader fed on the calling thread, so each stage runs, and is timed, on its own."""
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def is_alive(self):
+        return True
+
+    def feed(self, chunk, arrival_time):
+        timestamps, samples = self.source.feed(chunk, arrival_time)
+        self.publish(timestamps, samples)
+        return len(samples)
+
+
+def build_pipeline(protocol, num_values):
+    """Returns a reader, the AcquisitionManager draining it and a test scoring its output, as in the app."""
+    reader = BenchmarkReader(SerialSource('benchmark', num_values, protocol))
+    acquisition = AcquisitionManager(RESAMPLE_RATE, relative_angles=True)
+    acquisition.add_device('Benchmark', reader)
+    test = MobilityTest('Benchmark', acquisition.num_values, duration=float('inf'), scored_values=acquisition.device_values)
+    return reader, acquisition, test
+
+
+class PlotHost:
+    """The attributes DataTab reads from its main window."""
+
+    def __init__(self, live_ring):
+        self.live_ring = live_ring
+        self.latency_monitor = LatencyMonitor()
+
+
+def run_configuration(protocol, rate, num_values, seconds, app):
+    from gui.data_tab import DataTab
+
+    chunks = synthetic_stream(protocol, rate, num_values, seconds)
+    reader, acquisition, test = build_pipeline(protocol, num_values)
+    live_ring = SharedRing(16384, 1 + acquisition.num_values)
+    data_tab = DataTab(PlotHost(live_ring))
+    data_tab.set_channel_groups(acquisition.channel_groups, acquisition.group_labels)
+    data_tab.show()
+
+    latencies = {stage: [] for stage in STAGES}
+    samples = 0
+    next_frame = 0.0
+    start = time.perf_counter()
+    for tick, chunk in enumerate(chunks):
+        t0 = time.perf_counter()
+        samples += reader.feed(chunk, (tick + 1) * TICK)
+        t1 = time.perf_counter()
+        rows = acquisition.read()
+        t2 = time.perf_counter()
+        live_ring.write(rows)
+        t3 = time.perf_counter()
+        test.process(rows[:, 0], rows[:, 1:])
+        t4 = time.perf_counter()
+        latencies['parse'].append(t1 - t0)
+        latencies['acquire'].append(t2 - t1)
+        latencies['publish'].append(t3 - t2)
+        latencies['score'].append(t4 - t3)
+
+        if tick * TICK >= next_frame:
+            next_frame += FRAME_INTERVAL
+            t5 = time.perf_counter()
+            data_tab.render_plot()
+            app.processEvents()
+            latencies['render'].append(time.perf_counter() - t5)
+    elapsed = time.perf_counter() - start
+
+    # Memory is traced in a second pass, since tracing slows everything down
+    reader, acquisition, test = build_pipeline(protocol, num_values)
+    tracemalloc.start()
+    for tick, chunk in enumerate(chunks):
+        reader.feed(chunk, (tick + 1) * TICK)
+        rows = acquisition.read()
+        live_ring.write(rows)
+        test.process(rows[:, 0], rows[:, 1:])
+    data_tab.render_plot()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    data_tab.close()
+    live_ring.close()
+    result = {
+        'protocol': protocol,
+        'rate': rate,
+        'channels': num_values,
+        'samples': samples,
+        'samples_per_second': samples / elapsed,
+        'realtime_factor': samples / rate / elapsed,
+        'peak_memory_kib': peak_memory / 1024,
+    }
+    for stage, values in latencies.items():
+        values = np.array(values) * 1000
+        result[f'{stage}_ms'] = {p: float(np.percentile(values, p)) for p in (50, 95, 99)} if len(values) else None
+    return result
+
+
+def print_result(result):
+    stages = '  '.join(
+        f"{stage} {result[f'{stage}_ms'][50]:.3f}/{result[f'{stage}_ms'][95]:.3f}/{result[f'{stage}_ms'][99]:.3f}"
+        for stage in STAGES if result[f'{stage}_ms'] is not None
+    )
+    print(f"{result['protocol']:>6} {result['rate']:>6}Hz {result['channels']:>3}ch  "
+          f"{result['samples_per_second']:>10.0f} samples/s  x{result['realtime_factor']:<7.1f} "
+          f"{result['peak_memory_kib']:>8.0f} KiB  {stages}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the parse, acquire, publish, score and render stages")
+    parser.add_argument('--rates', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--channels', type=int, nargs='+', default=[6, 12, 24, 48])
+    parser.add_argument('--protocols', nargs='+', default=['ascii', 'binary'], choices=['ascii', 'binary'])
+    parser.add_argument('--seconds', type=float, default=2.0, help="seconds of stream per configuration")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+
+    print("Latencies are per 10ms tick in ms, as p50/p95/p99; x is how many times faster than real time")
+    results = []
+    for protocol in args.protocols:
+        for rate in args.rates:
+            for num_values in args.channels:
+                result = run_configuration(protocol, rate, num_values, args.seconds, app)
+                print_result(result)
+                results.append(result)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import logging
+import os
+import queue
+import re
+import signal
+import time
+from utils.acquisition import AcquisitionManager
+from utils.async_serial import AsyncSerialHub, AsyncSerialReader
+from utils.feed import DEFAULT_FEED_PORT, FeedServer
+from utils.profiler import PROFILER, profiled
+from utils.recorder import TEST_RECORDINGS_DIR, SessionRecorder, new_recording_path
+from utils.results_store import ResultsStore
+from utils.scoring import MobilityTest
+from utils.shared_ring import SharedRing
+from utils.sources import SerialSource, BluetoothSerialSource, RecordingSource, SyntheticSource, SourceReader
+
+logger = logging.getLogger(__name__)
+
+
+class AcquisitionDaemon:
+    """Headless owner of the devices: records them, scores tests and serves the live stream.
+
+    GUIs and scripts attach through the FeedServer on ``feed_port`` and may
+    come and go without interrupting capture. Clients can send the commands
+    ``status`` and ``start_test`` (with a ``joint``); results are stored and
+    broadcast to every client as a ``result`` event. Processes on the same
+    machine can instead attach the SharedRing named in the feed's HELLO.
+    """
+
+    def __init__(self, feed_port=DEFAULT_FEED_PORT, record=False, resample_rate=100.0, ring_capacity=65536):
+        self.acquisition = AcquisitionManager(resample_rate, relative_angles=True)
+        self.hub = AsyncSerialHub()
+        self.results_store = ResultsStore()
+        self.server = FeedServer(self.hub, port=feed_port)
+        self.record = record
+        self.ring_capacity = ring_capacity
+        self.live_ring = None
+        self.test = None
+        self.test_recorder = None  # Keeps the test's samples so it can be re-scored later
+        self.running = False
+
+    def add_source(self, name, source):
+        """Opens a source and starts acquiring from it as a new device."""
+        source.open()
+        recorder = None
+        if self.record:
+            recorder = SessionRecorder(new_recording_path(name.replace(' ', '_')), source.num_values, {
+                'device': name,
+                'source': source.description,
+                'yaw_is_angle': source.yaw_is_angle,
+            })
+        if isinstance(source, SerialSource):
+            reader = AsyncSerialReader(self.hub, source, recorder)
+        else:
+            reader = SourceReader(source, recorder)
+        self.acquisition.add_device(name, reader)
+        self.channel_groups_changed()
+        logger.info("Acquiring from %s (%s)", name, reader.description)
+
+    def channel_groups_changed(self):
+        self.cancel_test("devices changed")
+        if self.live_ring is not None:
+            self.live_ring.close()
+            self.live_ring = None
+        if self.acquisition.devices:
+            self.live_ring = SharedRing(self.ring_capacity, 1 + self.acquisition.num_values)
+        self.server.set_channel_groups(self.acquisition.channel_groups,
+                                       self.live_ring.name if self.live_ring is not None else None,
+                                       self.acquisition.group_labels, self.acquisition.device_values)
+
+    def run(self, poll_interval=0.01):
+        """Serves clients and acquires until stopped or every device has gone."""
+        self.server.start()
+        logger.info("Serving the live feed on %s:%d", self.server.host, self.server.port)
+        self.running = True
+        while self.running and self.acquisition.devices:
+            rows = self.acquisition.read()
+            if len(rows):
+                self.live_ring.write(rows)
+                self.server.publish(rows)
+                if self.test is not None:
+                    self.process_test_data(rows[:, 0], rows[:, 1:])
+
+            finished = self.acquisition.remove_finished()
+            for name, error in finished:
+                if error is not None:
+                    logger.warning("%s disconnected: %s", name, error)
+                else:
+                    logger.info("%s stream ended", name)
+            if finished:
+                self.channel_groups_changed()
+            self.handle_commands()
+            time.sleep(poll_interval)
+
+    @profiled('score')
+    def process_test_data(self, timestamps, samples):
+        PROFILER.add_bytes('score', samples.nbytes)
+        self.test_recorder.write(timestamps, samples)
+        result = self.test.process(timestamps, samples)
+        if result is not None:
+            self.test_recorder.close()
+            self.results_store.append(result, os.path.relpath(self.test_recorder.path))
+            self.server.send_event({
+                'event': 'result',
+                'result': result,
+                'robust_score': self.test.robust_score(),
+                'joint_max_differences': self.test.unscored_max_differences(),
+            })
+            logger.info("Test complete! Joint: %s Score: %s Max differences: %s", result[0], result[2], result[3],
+                        extra={'joint': result[0], 'score': result[2], 'recording': self.test_recorder.path})
+            self.test = None
+
+    def start_test(self, joint):
+        self.cancel_test("a new test started")
+        self.test_recorder = SessionRecorder(
+            new_recording_path(re.sub(r'[^\w-]', '_', joint), TEST_RECORDINGS_DIR), self.acquisition.num_values,
+            {'joint': joint, 'channel_groups': self.acquisition.channel_groups,
+             'scored_values': self.acquisition.device_values},
+        )
+        # Derived joint channels are reported with the result but, like in every stored result, not scored
+        self.test = MobilityTest(joint, self.acquisition.num_values, scored_values=self.acquisition.device_values)
+
+    def cancel_test(self, reason):
+        if self.test is not None:
+            self.test = None
+            self.test_recorder.close()
+            os.remove(self.test_recorder.path)  # An incomplete test cannot be re-scored
+            self.server.send_event({'event': 'test_cancelled', 'reason': reason})
+
+    def handle_commands(self):
+        while True:
+            try:
+                command, client = self.server.commands.get_nowait()
+            except queue.Empty:
+                return
+            if not isinstance(command, dict):
+                # Clients are not trusted; a bad message gets an error, never stops capture
+                self.server.send_event({'event': 'error', 'message': f"Commands must be JSON objects, got {command!r}"}, client)
+                continue
+            name = command.get('command')
+            if name == 'status':
+                self.server.send_event({
+                    'event': 'status',
+                    'channel_groups': self.acquisition.channel_groups,
+                    'test': self.test.joint if self.test is not None else None,
+                    'clients': len(self.server.clients),
+                    'dropped': self.server.dropped,
+                }, client)
+            elif name == 'start_test':
+                joint = command.get('joint')
+                if not isinstance(joint, str) or not joint.strip():
+                    self.server.send_event({'event': 'error', 'message': f"start_test needs a joint name, got {joint!r}"}, client)
+                    continue
+                try:
+                    self.start_test(joint)
+                except OSError as e:
+                    self.server.send_event({'event': 'error', 'message': f"Could not start the test: {e}"}, client)
+                    continue
+                self.server.send_event({'event': 'test_started', 'joint': joint})
+            else:
+                self.server.send_event({'event': 'error', 'message': f"Unknown command {command}"}, client)
+
+    def stop(self, *args):
+        self.running = False
+
+    def close(self):
+        self.cancel_test("the daemon stopped")
+        self.acquisition.stop_all()
+        self.server.close()
+        self.hub.stop()
+        self.results_store.close()
+        if self.live_ring is not None:
+            self.live_ring.close()
+
+
+def parse_device(spec):
+    """Parses a ``NAME=PORT[,PROTOCOL]`` device option."""
+    name, _, port = spec.partition('=')
+    port, _, protocol = port.partition(',')
+    if not name or not port:
+        raise ValueError(f"Expected NAME=PORT[,PROTOCOL], got {spec}")
+    return name, port, protocol or 'ascii'
+
+
+def run_daemon(args):
+    daemon = AcquisitionDaemon(args.feed_port, args.record)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        for spec in args.device:
+            name, port, protocol = parse_device(spec)
+            if protocol == 'labelled':
+                daemon.add_source(name, BluetoothSerialSource(port))
+            else:
+                daemon.add_source(name, SerialSource(port, 6, protocol))
+        for path in args.replay:
+            daemon.add_source(f"Replay {len(daemon.acquisition.devices) + 1}", RecordingSource(path))
+        for _ in range(args.synthetic):
+            daemon.add_source(f"Synthetic {len(daemon.acquisition.devices) + 1}", SyntheticSource())
+        if not daemon.acquisition.devices:
+            logger.error("No devices given, use --device, --replay or --synthetic")
+            return 1
+        daemon.run()
+    except (OSError, ValueError) as e:
+        logger.error("Daemon stopped: %s", e)
+        return 1
+    finally:
+        daemon.close()
+    return 0
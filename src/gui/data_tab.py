@@ -1,37 +1,140 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSpinBox
+from PyQt6.QtCore import QTimer, Qt
 import pyqtgraph as pg
+from utils.profiler import PROFILER, profiled
+
+MAX_WINDOW_SECONDS = 300  # What the live ring holds at the 100Hz acquisition rate
 
 class DataTab(QWidget):
     def __init__(self, parent):
         super().__init__()
         self.main_window = parent
-        self.num_values = 6  # Assuming 6 values from the IMU
+        self.values_per_device = 6  # Assuming 6 values from each IMU board
+        self.num_values = self.values_per_device  # Values across every connected device
+        self.channel_groups = []  # (device name, number of values) per connected device
         self.curves = []  # Store multiple lines for each value
-        self.data_buffers = [[] for _ in range(self.num_values)]  # Moving window for each value
-        self.max_points = 200  # ~20 seconds of data if sampling every 100ms
+        self.window_seconds = 60  # Seconds of samples on screen, whatever the sample rate
         self.sensor_labels = ["Sensor 1", "Sensor 2", "Sensor 3", "Sensor 4", "Sensor 5", "Sensor 6"] # Labels for the legend
+        self.channel_labels = list(self.sensor_labels)
+        self.max_fps = 30  # Upper bound on redraws per second
+        self.dirty = False  # Set when the curves changed since the last redraw
+        self.rendered_index = 0  # Live ring write index at the last redraw
+        self.render_timer = QTimer()
+        self.render_timer.timeout.connect(self.render_plot)
         self.initUI()
 
     def initUI(self):
         layout = QVBoxLayout()
 
-        self.graph = pg.PlotWidget(title="Orientation Sensor Measurements Over Time Steps")
+        window_controls = QHBoxLayout()
+        window_controls.addWidget(QLabel("Show last:"))
+        self.window_spinbox = QSpinBox()
+        self.window_spinbox.setRange(1, MAX_WINDOW_SECONDS)
+        self.window_spinbox.setSuffix(" s")
+        self.window_spinbox.setValue(self.window_seconds)
+        self.window_spinbox.valueChanged.connect(self.set_window_seconds)
+        window_controls.addWidget(self.window_spinbox)
+        window_controls.addStretch()
+        layout.addLayout(window_controls)
+
+        self.graph = pg.PlotWidget(title="Orientation Sensor Measurements Over Time")
         self.graph.setLabel('left', "Angular Deviation")
-        self.graph.setLabel('bottom', "Step")
+        self.graph.setLabel('bottom', "Time before latest sample (s)")
+        # Time runs up to 0 at the right edge; only the vertical axis follows the data
+        self.graph.setXRange(-self.window_seconds, 0, padding=0)
+        self.graph.enableAutoRange(axis='x', enable=False)
+        # Only draw what is on screen, reduced to roughly one point per pixel
+        self.graph.setClipToView(True)
+        self.graph.setDownsampling(auto=True, mode='peak')
         layout.addWidget(self.graph)
 
+        self.graph.addLegend()
+        self.create_curves()
+        self.setLayout(layout)
+
+    def create_curves(self):
+        for curve in self.curves:
+            self.graph.removeItem(curve)
+        self.curves = []
+
         colors = ['r', 'g', 'b', 'c', 'm', 'y']  # Different colors for each line
-        for i in range(self.num_values):
-            curve = self.graph.plot(pen=colors[i % len(colors)], name=self.sensor_labels[i])
+        styles = [Qt.PenStyle.SolidLine, Qt.PenStyle.DashLine, Qt.PenStyle.DotLine]  # Different styles for each device
+        for i, label in enumerate(self.channel_labels):
+            group = self.group_of_channel(i)
+            pen = pg.mkPen(colors[i % len(colors)], style=styles[group % len(styles)])
+            curve = self.graph.plot(pen=pen, name=label)
             self.curves.append(curve)
 
-        self.graph.addLegend()
-        self.setLayout(layout)
+    def group_of_channel(self, channel):
+        end = 0
+        for group, (_, num_values) in enumerate(self.channel_groups):
+            end += num_values
+            if channel < end:
+                return group
+        return 0
+
+    def set_channel_groups(self, channel_groups, group_labels=None):
+        """Shows one curve per value of every connected device, labelled by device name.
+
+        ``group_labels`` maps the names of groups such as derived joint angles
+        to their own channel labels.
+        """
+        if not channel_groups or channel_groups == self.channel_groups:
+            return  # Keep the last plot on screen once everything disconnects
+
+        self.channel_groups = list(channel_groups)
+        self.num_values = sum(num_values for _, num_values in channel_groups)
+        self.channel_labels = []
+        group_labels = group_labels or {}
+        for name, num_values in channel_groups:
+            labels = group_labels.get(name) or [self.sensor_labels[i] if i < len(self.sensor_labels) else f"Value {i + 1}" for i in range(num_values)]
+            if len(channel_groups) > 1:
+                labels = [f"{name} {label}" for label in labels]
+            self.channel_labels.extend(labels)
+
+        self.create_curves()
+        self.dirty = True
+
+    @profiled('plot')
+    def render_plot(self):
+        """Redraws the curves from the latest samples in the live ring, at most once per frame."""
+        live_ring = self.main_window.live_ring
+        if not self.isVisible() or (not self.dirty and live_ring.write_index == self.rendered_index):
+            return
+        if live_ring.width != self.num_values + 1:
+            return  # The ring is being replaced for a new device layout
+
+        self.dirty = False
+        self.rendered_index = live_ring.write_index
+        newest = live_ring.latest(1)
+        window = live_ring.since(newest[0, 0] - self.window_seconds) if len(newest) else newest
+        PROFILER.add_bytes('plot', window.nbytes)
+        times = window[:, 0] - window[-1, 0] if len(window) else window[:, 0]
+        for i in range(self.num_values):
+            self.curves[i].setData(times, window[:, i + 1])
+        if len(window):
+            # How old the newest plotted sample is by the time it is drawn
+            self.main_window.latency_monitor.record_since('render', window[-1, 0])
+
+    def set_window_seconds(self, seconds):
+        """Shows the last ``seconds`` of samples, as far back as the live ring holds them."""
+        self.window_seconds = seconds
+        self.graph.setXRange(-seconds, 0, padding=0)
+        self.dirty = True
+        self.render_plot()
+
+    def set_max_fps(self, fps):
+        self.max_fps = fps
+        if self.render_timer.isActive():
+            self.render_timer.start(max(1, round(1000 / self.max_fps)))
+
+    def showEvent(self, event):
+        """Called when the tab is shown, catch up on samples and resume redrawing."""
+        super().showEvent(event)
+        self.render_plot()
+        self.render_timer.start(max(1, round(1000 / self.max_fps)))
 
-    def update_plot(self, new_values):
-        if len(new_values) == self.num_values:
-            for i in range(self.num_values):
-                self.data_buffers[i].append(new_values[i])
-                if len(self.data_buffers[i]) > self.max_points:
-                    self.data_buffers[i].pop(0)
-                self.curves[i].setData(self.data_buffers[i])
\ No newline at end of file
+    def hideEvent(self, event):
+        """Called when the tab is hidden, samples keep arriving in the live ring but nothing is drawn."""
+        super().hideEvent(event)
+        self.render_timer.stop()
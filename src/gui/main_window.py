@@ -2,7 +2,15 @@ from PyQt6.QtWidgets import QMainWindow, QTabWidget
 from .serial_tab import SerialTab
 from .data_tab import DataTab
 from .test_tab import TestTab
-import json
+from utils.results_store import ResultsStore
+from utils.results_index import ResultsIndex
+from utils.acquisition import AcquisitionManager
+from utils.async_serial import AsyncSerialHub
+from utils.shared_ring import SharedRing
+from utils.latency import LatencyMonitor
+from utils.profiler import profiled
+
+LIVE_RING_CAPACITY = 32768  # Merged frames kept for the plot, the test and any attached process; over 5 minutes at 100Hz
 
 class IMUGUI(QMainWindow):
     def __init__(self):
@@ -10,8 +18,14 @@ class IMUGUI(QMainWindow):
         self.setWindowTitle("IMU Data Collection")
         self.setGeometry(100, 100, 800, 600)
 
-        self.serial_port = None
-        self.test_results = []
+        # Common 100Hz grid for every device, plus the joint angle between each board's two sensors
+        self.acquisition = AcquisitionManager(resample_rate=100.0, relative_angles=True)
+        self.serial_hub = AsyncSerialHub()
+        self.results_store = ResultsStore()
+        self.results_index = ResultsIndex()
+        self.live_ring = SharedRing(LIVE_RING_CAPACITY, 1 + 6)  # Rows of [time, values...], resized per device layout
+        self.live_ring_groups = []
+        self.latency_monitor = LatencyMonitor()  # Enabled from the diagnostics panel
 
         self.load_test_results()  # Load any previous test results from file
 
@@ -34,17 +48,30 @@ class IMUGUI(QMainWindow):
         self.tabs.addTab(self.test_tab_widget, "Joint Mobility Test")
 
     def load_test_results(self):
-        try:
-            with open('data/test_results.json', 'r') as file:
-                self.test_results = json.load(file)
-        except FileNotFoundError:
-            self.test_results = []
+        self.results_index = ResultsIndex(self.results_store.load_all())
+
+    @profiled('persistence')
+    def save_test_results(self, result, recording=None):
+        """Adds a completed test result to the in-memory index and to the results store."""
+        self.results_index.add(result)
+        self.results_store.append(result, recording)
 
-    def save_test_results(self):
-        with open('data/test_results.json', 'w') as file:
-            json_lines = [json.dumps(result) for result in self.test_results]
-            file.write('[\n  ' + ',\n  '.join(json_lines) + '\n]')
+    def channel_groups_changed(self):
+        """Reconfigures the plot and test tabs after a device was connected or disconnected."""
+        channel_groups = self.acquisition.channel_groups
+        if channel_groups and channel_groups != self.live_ring_groups:
+            # Frames are fixed width, so a new layout gets a new ring
+            self.live_ring.close()
+            self.live_ring = SharedRing(LIVE_RING_CAPACITY, 1 + self.acquisition.num_values)
+            self.live_ring_groups = channel_groups
+        self.data_tab_widget.set_channel_groups(channel_groups, self.acquisition.group_labels)
+        self.test_tab_widget.channel_groups_changed()
 
     def closeEvent(self, event):
         # Events on close of application
-        pass
\ No newline at end of file
+        self.test_tab_widget.cancel_test("the application closed")
+        self.acquisition.stop_all()
+        self.serial_hub.stop()
+        self.results_store.close()
+        self.live_ring.close()
+        super().closeEvent(event)
\ No newline at end of file
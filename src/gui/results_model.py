@@ -0,0 +1,32 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+class ResultsTableModel(QAbstractTableModel):
+    """Table model over a list of results that only formats the rows the view asks for."""
+
+    headers = ["Date", "Score", "Max Differences"]
+
+    def __init__(self):
+        super().__init__()
+        self.results = []
+
+    def set_results(self, results):
+        self.beginResetModel()
+        self.results = results
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.results)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        result = self.results[index.row()]
+        return str(result[index.column() + 1])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
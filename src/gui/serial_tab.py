@@ -1,6 +1,18 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton
+import logging
+import os
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QCheckBox, QLineEdit
 from PyQt6.QtCore import QTimer
-from utils.serial_utils import list_serial_ports, connect_serial_port
+from PyQt6.QtGui import QFontDatabase
+from utils.serial_utils import list_serial_ports
+from utils.async_serial import AsyncSerialReader
+from utils.recorder import SessionRecorder, new_recording_path, list_recordings
+from utils.sources import SerialSource, BluetoothSerialSource, RecordingSource, SyntheticSource, SourceReader
+from utils.feed import FeedSource
+from utils.profiler import PROFILER, profiled
+
+logger = logging.getLogger(__name__)
+
+REPLAY_SPEEDS = [("1x", 1.0), ("4x", 4.0), ("16x", 16.0), ("Max", 0.0)]
 
 class SerialTab(QWidget):
     def __init__(self, parent):
@@ -8,61 +20,220 @@ class SerialTab(QWidget):
         self.main_window = parent
         self.timer = QTimer()
         self.timer.timeout.connect(self.read_serial_data)
+        self.diagnostics_timer = QTimer()
+        self.diagnostics_timer.timeout.connect(self.update_diagnostics)
         self.initUI()
 
     def initUI(self):
         layout = QVBoxLayout()
 
-        self.port_label = QLabel("Select Serial Port:")
+        self.port_label = QLabel("Select Serial Port, Recording or Synthetic Source:")
         layout.addWidget(self.port_label)
 
         self.port_combobox = QComboBox()
         self.update_serial_ports()
         layout.addWidget(self.port_combobox)
 
+        self.device_name_label = QLabel("Device Name:")
+        layout.addWidget(self.device_name_label)
+
+        self.device_name_edit = QLineEdit()
+        self.device_name_edit.setPlaceholderText("e.g. Left Ankle Board")
+        layout.addWidget(self.device_name_edit)
+
+        self.protocol_label = QLabel("Data Format:")
+        layout.addWidget(self.protocol_label)
+
+        self.protocol_combobox = QComboBox()
+        self.protocol_combobox.addItem("ASCII CSV", "ascii")
+        self.protocol_combobox.addItem("Binary Frames", "binary")
+        self.protocol_combobox.addItem("Raw IMU Frames", "raw")
+        self.protocol_combobox.addItem("Labelled CSV (Bluetooth)", "labelled")
+        layout.addWidget(self.protocol_combobox)
+
+        self.speed_label = QLabel("Replay Speed:")
+        layout.addWidget(self.speed_label)
+
+        self.speed_combobox = QComboBox()
+        for label, speed in REPLAY_SPEEDS:
+            self.speed_combobox.addItem(label, speed)
+        layout.addWidget(self.speed_combobox)
+
+        self.record_checkbox = QCheckBox("Record Session")
+        layout.addWidget(self.record_checkbox)
+
+        buttons = QHBoxLayout()
         self.connect_button = QPushButton("Connect")
         self.connect_button.clicked.connect(self.connect_button_clicked)
-        layout.addWidget(self.connect_button)
+        buttons.addWidget(self.connect_button)
+
+        self.disconnect_button = QPushButton("Disconnect All")
+        self.disconnect_button.clicked.connect(self.stop_reader)
+        buttons.addWidget(self.disconnect_button)
+        layout.addLayout(buttons)
 
         self.serial_status = QLabel("Status: Not Connected")
         layout.addWidget(self.serial_status)
 
+        diagnostics_controls = QHBoxLayout()
+        self.diagnostics_checkbox = QCheckBox("Show Latency Diagnostics")
+        self.diagnostics_checkbox.toggled.connect(self.set_diagnostics_enabled)
+        diagnostics_controls.addWidget(self.diagnostics_checkbox)
+        self.reset_diagnostics_button = QPushButton("Reset")
+        self.reset_diagnostics_button.clicked.connect(self.main_window.latency_monitor.reset)
+        self.reset_diagnostics_button.setVisible(False)
+        diagnostics_controls.addWidget(self.reset_diagnostics_button)
+        diagnostics_controls.addStretch()
+        layout.addLayout(diagnostics_controls)
+
+        self.diagnostics = QLabel()
+        self.diagnostics.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.diagnostics.setVisible(False)
+        layout.addWidget(self.diagnostics)
+
         self.setLayout(layout)
 
     def update_serial_ports(self):
-        ports = list_serial_ports()
         self.port_combobox.clear()
-        self.port_combobox.addItems(ports)
+        for port in list_serial_ports():
+            self.port_combobox.addItem(port, ("serial", port))
+        for path in list_recordings():
+            self.port_combobox.addItem(f"Replay: {os.path.basename(path)}", ("replay", path))
+        self.port_combobox.addItem("Synthetic IMU", ("synthetic", None))
+        self.port_combobox.addItem("Daemon Feed (this computer)", ("feed", None))
 
     def connect_button_clicked(self):
-        port_name = self.port_combobox.currentText()
-        serial_port = connect_serial_port(port_name, 115200)
-        if serial_port:
-            self.main_window.serial_port = serial_port
-            self.serial_status.setText(f"Connected to {port_name}")
-            self.timer.start(10)  # Faster updates (10ms interval)
-        else:
-            self.main_window.serial_port = None
-            self.serial_status.setText("Connection Failed")
+        """Connects the selected source as one more device alongside any already connected."""
+        acquisition = self.main_window.acquisition
+        name = self.device_name_edit.text().strip() or f"Board {len(acquisition.devices) + 1}"
+        if name in acquisition.devices:
+            self.serial_status.setText(f"A device named {name} is already connected")
+            return
 
-    def read_serial_data(self):
-        if self.main_window.serial_port and self.main_window.serial_port.is_open:
+        kind, target = self.port_combobox.currentData() or ("serial", self.port_combobox.currentText())
+        source = self.create_source(kind, target)
+        source.latency = self.main_window.latency_monitor
+        try:
+            source.open()
+        except (OSError, ValueError) as e:
+            logger.warning("Connecting %s failed: %s", name, e)
+            self.serial_status.setText(f"Connection Failed: {e}")
+            return
+
+        recorder = None
+        if self.record_checkbox.isChecked() and kind != "replay":
+            metadata = {
+                'device': name,
+                'source': source.description,
+                'labels': self.main_window.data_tab_widget.sensor_labels,
+                'yaw_is_angle': source.yaw_is_angle,
+            }
+            if source.channel_groups:
+                # A recorded daemon feed replays with its groups, so its joint angles stay unscored
+                metadata.update(channel_groups=source.channel_groups, group_labels=source.group_labels,
+                                scored_values=source.scored_values)
             try:
-                bytes_to_read = self.main_window.serial_port.in_waiting
-                if bytes_to_read > 0:
-                    raw_data = self.main_window.serial_port.read(bytes_to_read).decode('utf-8', errors='ignore')
-                    lines = raw_data.strip().split('\n')
+                recorder = SessionRecorder(new_recording_path(name.replace(' ', '_')), source.num_values, metadata)
+            except (OSError, ValueError) as e:
+                source.close()
+                logger.warning("Recording %s failed: %s", name, e)
+                self.serial_status.setText(f"Could not record {name}: {e}")
+                return
+        if kind == "serial":
+            # Every port shares the one event loop, which only wakes when a port has data
+            reader = AsyncSerialReader(self.main_window.serial_hub, source, recorder)
+        else:
+            reader = SourceReader(source, recorder)
+        if recorder is not None:
+            reader.description += f", recording to {recorder.path}"
+
+        acquisition.add_device(name, reader)
+        logger.info("Acquiring from %s (%s)", name, reader.description)
+        self.device_name_edit.clear()
+        self.main_window.channel_groups_changed()
+        self.update_status()
+        self.timer.start(10)  # Drain parsed samples every 10ms
 
-                    for line in lines:
-                        values = line.strip().split(',')
+    def create_source(self, kind, target):
+        num_values = self.main_window.data_tab_widget.values_per_device
+        if kind == "replay":
+            # Feeds a recorded session through the same path as a live port
+            source = RecordingSource(target, speed=self.speed_combobox.currentData())
+            source.description = f"replaying {os.path.basename(target)} at {self.speed_combobox.currentText()}"
+            return source
+        if kind == "synthetic":
+            return SyntheticSource(num_values)
+        if kind == "feed":
+            # Every device of a headless daemon, merged, arriving as one device with the daemon's channel groups
+            return FeedSource()
+        protocol = self.protocol_combobox.currentData()
+        if protocol == "labelled":
+            return BluetoothSerialSource(target)
+        return SerialSource(target, num_values, protocol)
 
-                        if len(values) == self.main_window.data_tab_widget.num_values and all(v.replace('.', '', 1).replace('-', '', 1).isdigit() for v in values):
-                            values = [round(float(v), 1) for v in values]  # Limit precision to 1 decimal place
+    def update_status(self, message=None):
+        devices = self.main_window.acquisition.devices
+        if devices:
+            status = "Connected: " + "; ".join(f"{name} ({reader.description})" for name, reader in devices.items())
+        else:
+            status = "Status: Not Connected"
+        self.serial_status.setText(status if message is None else f"{message}\n{status}")
 
-                            if self.main_window.test_tab_widget.test_active:
-                                self.main_window.test_tab_widget.process_test_data(values)
+    def is_streaming(self):
+        return self.main_window.acquisition.is_alive()
+
+    @profiled('acquisition')
+    def read_serial_data(self):
+        """Publishes the merged samples from every device to the live ring."""
+        acquisition = self.main_window.acquisition
+        rows = acquisition.read()
+        if len(rows):
+            PROFILER.add_bytes('acquisition', rows.nbytes)
+            # Published once; the plot and the test each read it through the shared ring
+            self.main_window.live_ring.write(rows)
+            self.main_window.latency_monitor.record_since('publish', rows[:, 0])
+            self.main_window.test_tab_widget.process_test_data()
+
+        finished = acquisition.remove_finished()
+        if finished:
+            messages = [f"{name} disconnected: {error}" if error is not None else f"{name} stream ended"
+                        for name, error in finished]
+            for message in messages:
+                logger.info(message)
+            self.main_window.channel_groups_changed()
+            self.update_status("\n".join(messages))
+        if not acquisition.devices:
+            self.timer.stop()
+
+    def set_diagnostics_enabled(self, enabled):
+        """Turns latency recording and the diagnostics panel on or off together."""
+        self.main_window.latency_monitor.enabled = enabled
+        self.diagnostics.setVisible(enabled)
+        self.reset_diagnostics_button.setVisible(enabled)
+        if enabled:
+            self.main_window.latency_monitor.reset()
+            self.update_diagnostics()
+            self.diagnostics_timer.start(500)
+        else:
+            self.diagnostics_timer.stop()
 
-                            self.main_window.data_tab_widget.update_plot(values)
+    def update_diagnostics(self):
+        """Shows latency percentiles per stage and every device's loss counters."""
+        lines = [f"{'Latency (ms)':<12} {'count':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"]
+        for stage, (count, p50, p95, p99, maximum) in self.main_window.latency_monitor.summary().items():
+            lines.append(f"{stage:<12} {count:>8} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {maximum:>8.1f}")
+        for name, reader in self.main_window.acquisition.devices.items():
+            counters = ", ".join(f"{counter} {value}" for counter, value in reader.counters().items())
+            lines.append(f"{name}: {counters}")
+        test_cursor = self.main_window.test_tab_widget.cursor
+        if test_cursor is not None:
+            lines.append(f"Test: ring overruns {test_cursor.overruns}")
+        self.diagnostics.setText("\n".join(lines))
 
-            except ValueError:
-                print("Invalid data format:", raw_data)
\ No newline at end of file
+    def stop_reader(self):
+        """Stops every reader thread, which closes their serial ports."""
+        self.timer.stop()
+        if self.main_window.acquisition.devices:
+            self.main_window.acquisition.stop_all()
+            self.main_window.channel_groups_changed()
+            self.update_status()
@@ -1,14 +1,22 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton, QTextEdit
-from PyQt6.QtCore import QDateTime
+import logging
+import os
+import time
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton, QTextEdit, QTableView, QHeaderView
+from .results_model import ResultsTableModel
+from utils.recorder import TEST_RECORDINGS_DIR, SessionRecorder, new_recording_path
+from utils.profiler import PROFILER, profiled
+from utils.scoring import MobilityTest, calculate_score, group_scores
+
+logger = logging.getLogger(__name__)
 
 class TestTab(QWidget):
     def __init__(self, parent):
         super().__init__()
         self.main_window = parent
         self.test_active = False
-        self.test_start_time = None
-        self.max_diff = None
-        self.datum = None
+        self.test = None
+        self.cursor = None  # Position in the live ring, from the start of the test
+        self.recorder = None  # Keeps the test's samples so it can be re-scored later
         self.initUI()
         self.load_test_page()
         self.update_start_button_state() # Initial state of the button
@@ -36,9 +44,14 @@ class TestTab(QWidget):
         self.previous_results_label = QLabel("Previous Results:")
         layout.addWidget(self.previous_results_label)
 
-        self.previous_results_text = QTextEdit()
-        self.previous_results_text.setReadOnly(True)
-        layout.addWidget(self.previous_results_text)
+        self.previous_results_model = ResultsTableModel()
+        self.previous_results_table = QTableView()
+        self.previous_results_table.setModel(self.previous_results_model)
+        self.previous_results_table.verticalHeader().setVisible(False)
+        # Fixed row heights let the view skip measuring rows it never shows
+        self.previous_results_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.previous_results_table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.previous_results_table)
 
         # Highest Score Section
         self.highest_score_label = QLabel("Highest Score:")
@@ -91,71 +104,109 @@ class TestTab(QWidget):
 
     def update_previous_results(self):
         joint = self.test_combobox.currentText()
-        results_for_joint = [result for result in self.main_window.test_results if result[0] == joint]
+        results_for_joint = self.main_window.results_index.results_for_joint(joint)
+        self.previous_results_model.set_results(results_for_joint)
 
         if results_for_joint:
-            # Display the results with scores
-            results_text = "\n".join([
-                f"Date: {result[1]}, Score: {result[2]}, Max Differences: {result[3]}"
-                for result in results_for_joint
-            ])
-            self.previous_results_text.setText(results_text)
-
-            # Calculate and display the highest score
-            highest_score_result = max(
-                results_for_joint,
-                key=lambda result: result[2],
-                default=None
+            self.previous_results_label.setText("Previous Results:")
+
+            # Display the highest score, tracked by the index as results are added
+            highest_score_result = self.main_window.results_index.best_for_joint(joint)
+            self.highest_score_text.setText(
+                f"Date: {highest_score_result[1]}, Score: {highest_score_result[2]}, Max Differences: {highest_score_result[3]}"
             )
-            if highest_score_result:
-                highest_score = highest_score_result[2]
-                self.highest_score_text.setText(
-                    f"Date: {highest_score_result[1]}, Score: {highest_score}, Max Differences: {highest_score_result[3]}"
-                )
-            else:
-                self.highest_score_text.setText("No results yet")
         else:
-            self.previous_results_text.setText("No previous results")
+            self.previous_results_label.setText("Previous Results: No previous results")
             self.highest_score_text.setText("No results yet")
 
     def start_test(self):
-        self.datum = None
+        joint = self.test_combobox.currentText()
+        num_values = self.main_window.data_tab_widget.num_values
+        # Derived joint channels are shown but, like in every stored result, not scored
+        scored_values = self.main_window.acquisition.device_values
+        try:
+            self.recorder = SessionRecorder(new_recording_path(joint.replace(' ', '_'), TEST_RECORDINGS_DIR), num_values, {
+                'joint': joint,
+                'channel_groups': self.main_window.data_tab_widget.channel_groups,
+                'scored_values': scored_values,
+            })
+        except (OSError, ValueError) as e:
+            logger.warning("Could not start the test: %s", e)
+            self.test_info.setText(f"Could not start the test: {e}")
+            return
+        self.test = MobilityTest(joint, num_values, scored_values=scored_values)
+        self.cursor = self.main_window.live_ring.cursor()
         self.test_active = True
-        self.test_start_time = QDateTime.currentDateTime().toSecsSinceEpoch()
-        self.max_diff = [0.0] * self.main_window.data_tab_widget.num_values
         self.start_test_button.setEnabled(False)
         self.test_info.setText("Test in progress... Please move the joint.")
 
-    def process_test_data(self, current_values):
+    @profiled('score')
+    def process_test_data(self):
+        """Scores the samples published to the live ring since the last call."""
         if self.test_active:
-            current_time = QDateTime.currentDateTime().toSecsSinceEpoch()
-            elapsed_time = current_time - self.test_start_time
-
-            if self.datum is None:
-                self.datum = [float(v) for v in current_values]
-
-            diffs = [abs(float(current_values[i]) - self.datum[i]) for i in range(self.main_window.data_tab_widget.num_values)]
-            self.max_diff = [max(self.max_diff[i], diffs[i]) for i in range(self.main_window.data_tab_widget.num_values)]
-
-            if elapsed_time >= 10:
-                rounded_max_diff = [round(diff, 1) for diff in self.max_diff]
-                score = self.calculate_score(rounded_max_diff)  # Calculate score using the new function
-                new_result = [
-                    self.test_combobox.currentText(),
-                    QDateTime.currentDateTime().toString(),
-                    score,
-                    rounded_max_diff
-                ]
-                self.main_window.test_results.append(new_result)
-                self.main_window.save_test_results()
+            start = time.perf_counter()
+            rows = self.cursor.read()
+            PROFILER.add_bytes('score', rows.nbytes)
+            self.recorder.write(rows[:, 0], rows[:, 1:])
+            new_result = self.test.process(rows[:, 0], rows[:, 1:])
+            self.main_window.latency_monitor.record('score', time.perf_counter() - start)
+            if new_result is not None:
+                self.recorder.close()
+                self.main_window.save_test_results(new_result, os.path.relpath(self.recorder.path))
                 self.test_active = False
                 self.start_test_button.setEnabled(True)
-                self.test_info.setText(f"Test complete! Score: {score} Max differences: {rounded_max_diff}")
+                score, rounded_max_diff = new_result[2], new_result[3]
+                self.test_info.setText(
+                    f"Test complete! Score: {score} Max differences: {rounded_max_diff}"
+                    f"\nRobust score (5th to 95th percentile ranges): {self.test.robust_score()}"
+                    + self.group_scores_text(rounded_max_diff)
+                    + self.joint_angles_text()
+                )
                 self.update_previous_results()
 
+    def split_channel_groups(self):
+        """The test's channel groups, split into scored device groups and derived joint groups."""
+        channel_groups = self.main_window.data_tab_widget.channel_groups
+        scored, total = [], 0
+        for name, num_values in channel_groups:
+            if total >= self.test.scored_values:
+                break
+            scored.append((name, num_values))
+            total += num_values
+        return scored, channel_groups[len(scored):]
+
+    def group_scores_text(self, max_differences):
+        """Breaks the score down per device when more than one device took part in the test."""
+        device_groups, _ = self.split_channel_groups()
+        if len(device_groups) < 2:
+            return ""
+        return "\n\n" + "\n".join(f"{name}: Score: {score} Max differences: {group_max_diff}"
+                                   for name, score, group_max_diff in group_scores(max_differences, device_groups))
+
+    def joint_angles_text(self):
+        """Reports the derived joint groups separately, since they are not part of the score."""
+        _, joint_groups = self.split_channel_groups()
+        if not joint_groups:
+            return ""
+        return "\n\nJoint angles (not included in the score):\n" + "\n".join(
+            f"{name}: Total: {score} Max differences: {group_max_diff}"
+            for name, score, group_max_diff in group_scores(self.test.unscored_max_differences(), joint_groups))
+
+    def channel_groups_changed(self):
+        """Abandons a running test when devices come or go, since its channels no longer line up."""
+        self.cancel_test("a device was connected or disconnected")
+        self.update_start_button_state()
+
+    def cancel_test(self, reason):
+        if self.test_active:
+            self.test_active = False
+            self.recorder.close()
+            os.remove(self.recorder.path)  # An incomplete test cannot be re-scored
+            self.test_info.setText(f"Test cancelled because {reason}.")
+
     def update_start_button_state(self):
-        """Enables or disables the start test button based on the serial connection status."""
-        if self.main_window.serial_port and self.main_window.serial_port.is_open:
+        """Enables or disables the start test button based on whether samples are streaming."""
+        if self.main_window.serial_tab_widget.is_streaming():
             self.start_test_button.setEnabled(True)
         else:
             self.start_test_button.setEnabled(False)
@@ -171,7 +222,4 @@ class TestTab(QWidget):
         # Optionally handle any cleanup if needed when the tab is hidden
 
     def calculate_score(self, max_differences):
-        """Calculates the score (sum of absolute values) from max differences,
-        rounded to one decimal place.
-        """
-        return round(sum(abs(value) for value in max_differences), 1)
+        return calculate_score(max_differences)
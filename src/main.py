@@ -1,9 +1,58 @@
+import argparse
+import logging
 import sys
-from PyQt6.QtWidgets import QApplication
-from gui.main_window import IMUGUI
+from utils.feed import DEFAULT_FEED_PORT
+from utils.logs import LOG_FILE, setup_logging
+from utils.profiler import PROFILER
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="RheumActive joint mobility tracker")
+    parser.add_argument('--daemon', action='store_true',
+                        help="acquire without a GUI and serve the live feed to GUIs and scripts")
+    parser.add_argument('--device', action='append', default=[], metavar='NAME=PORT[,PROTOCOL]',
+                        help="serial device for the daemon; PROTOCOL is ascii, binary, raw or labelled")
+    parser.add_argument('--replay', action='append', default=[], metavar='PATH',
+                        help="recorded session for the daemon to replay")
+    parser.add_argument('--synthetic', type=int, default=0, metavar='COUNT',
+                        help="number of synthetic devices for the daemon")
+    parser.add_argument('--record', action='store_true', help="record every daemon device")
+    parser.add_argument('--feed-port', type=int, default=DEFAULT_FEED_PORT,
+                        help="local TCP port the daemon serves the live feed on")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="profile the pipeline stages and dump the counters to PATH, "
+                             "as Prometheus text for .prom files and JSON otherwise")
+    parser.add_argument('--profile-interval', type=float, default=5.0, metavar='SECONDS',
+                        help="seconds between profile dumps")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="DEBUG adds one sample batch per second to the log")
+    parser.add_argument('--log-file', default=LOG_FILE, metavar='PATH',
+                        help="JSON lines log file, or an empty string to log to the console only")
+    args, qt_args = parser.parse_known_args(argv[1:])
+    return args, argv[:1] + qt_args
+
+
+def run(args, qt_argv):
+    if args.daemon:
+        from daemon import run_daemon
+        return run_daemon(args)
+
+    from PyQt6.QtWidgets import QApplication
+    from gui.main_window import IMUGUI
+
+    app = QApplication(qt_argv)
     window = IMUGUI()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    return app.exec()
+
+
+if __name__ == "__main__":
+    args, qt_argv = parse_args(sys.argv)
+    setup_logging(getattr(logging, args.log_level), args.log_file)
+    if args.profile:
+        PROFILER.start(args.profile, args.profile_interval)
+    try:
+        status = run(args, qt_argv)
+    finally:
+        PROFILER.stop()  # Writes a final dump
+    sys.exit(status)
@@ -0,0 +1,80 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from utils.logs import setup_logging
+from utils.recorder import TEST_RECORDINGS_DIR
+from utils.results_store import RESULTS_DB, ResultsStore
+from utils.scoring import TEST_DURATION, score_recording
+
+logger = logging.getLogger(__name__)
+
+
+def find_recordings(directory):
+    """Every session file under ``directory``, as paths relative to the working directory like the store keeps them."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.relpath(os.path.join(root, name)) for name in files if name.endswith('.rec'))
+    return sorted(paths)
+
+
+def rescore_file(path, duration):
+    """Worker: returns ``(path, result, error)`` for one recording."""
+    try:
+        return path, score_recording(path, duration), None
+    except (OSError, ValueError, KeyError) as e:
+        return path, None, e
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score recorded tests with the current scoring rules")
+    parser.add_argument('directory', nargs='?', default=TEST_RECORDINGS_DIR, help="directory of test recordings")
+    parser.add_argument('--db', default=RESULTS_DB, help="results database to update")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument('--duration', type=float, default=TEST_DURATION, help="seconds of each test to score")
+    parser.add_argument('--dry-run', action='store_true', help="print the new scores without storing them")
+    args = parser.parse_args(argv)
+    setup_logging(path=None)
+
+    paths = find_recordings(args.directory)
+    if not paths:
+        logger.error("No recordings found in %s", args.directory)
+        return 1
+
+    workers = args.workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results, skipped = [], 0
+    with ProcessPoolExecutor(workers) as executor:
+        # Files are small, so hand them out in batches to keep the workers busy
+        chunksize = max(1, len(paths) // (4 * workers))
+        for path, result, error in executor.map(rescore_file, paths, [args.duration] * len(paths), chunksize=chunksize):
+            if error is not None:
+                logger.warning("Skipped %s: %s", path, error)
+                skipped += 1
+            elif result is None:
+                logger.warning("Skipped %s: shorter than %gs", path, args.duration)
+                skipped += 1
+            else:
+                results.append((result, path))
+                if args.dry_run:
+                    print(f"{path}: {result[0]} Score: {result[2]} Max differences: {result[3]}")
+
+    elapsed = time.perf_counter() - start
+    if args.dry_run:
+        logger.info("Scored %d recordings (%d skipped) in %.1fs, nothing stored", len(results), skipped, elapsed)
+        return 0
+
+    store = ResultsStore(args.db)
+    try:
+        replaced = store.replace_recorded(results)
+    finally:
+        store.close()
+    logger.info("Re-scored %d recordings (%d replaced, %d added, %d skipped) in %.1fs",
+                len(results), replaced, len(results) - replaced, skipped, elapsed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs from src/, importing utils and gui as top-level packages
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,32 @@
+from utils.acquisition import AcquisitionManager
+from utils.sources import SourceReader, SyntheticSource
+
+
+def reader(num_values, channel_groups=None, scored_values=None):
+    source = SyntheticSource(num_values, realtime=False)
+    source.channel_groups = channel_groups
+    source.scored_values = scored_values
+    source.open()
+    return SourceReader(source)
+
+
+def test_derived_groups_a_device_brings_follow_every_device_own_values():
+    acquisition = AcquisitionManager(100.0, relative_angles=True)
+    # Added without starting, only the layout is under test
+    acquisition.devices['Feed'] = reader(10, [('Daemon Board', 6), ('Daemon Board Joint', 4)], 6)
+    acquisition.devices['Board 2'] = reader(6)
+
+    assert acquisition.channel_groups == [('Daemon Board', 6), ('Board 2', 6),
+                                          ('Daemon Board Joint', 4), ('Board 2 Joint', 4)]
+    assert acquisition.device_values == 12
+    assert acquisition.column_order().tolist() == [0, *range(1, 7), *range(11, 17), *range(7, 11), *range(17, 21)]
+    assert list(acquisition.group_labels) == ['Board 2 Joint']
+
+
+def test_plain_devices_keep_their_order():
+    acquisition = AcquisitionManager(100.0, relative_angles=True)
+    acquisition.devices['Board 1'] = reader(6)
+    acquisition.devices['Board 2'] = reader(9)
+    assert acquisition.channel_groups == [('Board 1', 6), ('Board 2', 9), ('Board 1 Joint', 4)]
+    assert acquisition.device_values == 15
+    assert acquisition.column_order() is None
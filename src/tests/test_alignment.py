@@ -0,0 +1,68 @@
+import time
+import numpy as np
+from utils.acquisition import AcquisitionManager
+from utils.alignment import Resampler
+from utils.recorder import SessionRecorder
+from utils.scoring import MobilityTest, score_recording
+from utils.sources import RecordingSource, SourceReader
+
+
+def stream(start, count, rate=100.0, width=1, value=None):
+    times = start + np.arange(count) / rate
+    values = np.full((count, width), value) if value is not None else np.sin(times)[:, None] * np.ones(width)
+    return np.column_stack((times, values))
+
+
+def test_large_batch_is_resampled_whole():
+    resampler = Resampler([1], 100.0, max_pending=100)
+    rows = resampler.process([stream(10.0, 6000)])
+    assert len(rows) == 6000
+    assert resampler.dropped == 0
+
+
+def test_quiet_stream_does_not_stall_the_others():
+    resampler = Resampler([1, 1], 100.0)
+    resampler.process([stream(10.0, 10, value=1.0), stream(10.0, 10, value=2.0)])
+    rows = resampler.process([stream(10.1, 200, value=1.0), np.empty((0, 2))])
+    assert len(rows) > 150
+    assert np.all(rows[:, 2] == 2.0)  # The quiet stream's last value is held
+
+
+def test_nothing_is_produced_until_every_stream_reports():
+    resampler = Resampler([1, 1], 100.0, max_pending=100)
+    for second in range(5):
+        rows = resampler.process([stream(10.0 + second, 100, value=1.0), np.empty((0, 2))])
+        assert len(rows) == 0
+        assert len(resampler.pending[0]) <= 1
+    rows = resampler.process([stream(15.0, 100, value=1.0), stream(15.0, 100, value=2.0)])
+    assert len(rows) > 0
+    assert not np.isnan(rows).any()
+    assert np.all(rows[:, 2] == 2.0)  # Never a jump from a made-up 0
+
+
+def test_max_speed_replay_scores_like_the_recording(tmp_path):
+    path = str(tmp_path / 'test.rec')
+    rng = np.random.default_rng(0)
+    times = 1000.0 + np.arange(6000) / 100.0
+    values = 40 * np.sin(np.linspace(0, 30, 6000))[:, None] * rng.uniform(0.5, 1.5, 6) + rng.normal(0, 1, (6000, 6))
+    recorder = SessionRecorder(path, 6, {'joint': 'Left Ankle'})
+    recorder.write(times, values)
+    recorder.close()
+
+    source = RecordingSource(path, speed=0.0)
+    source.open()
+    acquisition = AcquisitionManager(100.0)
+    acquisition.add_device('Replay', SourceReader(source))
+    test = MobilityTest('Left Ankle', 6)
+    count = 0
+    while acquisition.devices:
+        rows = acquisition.read()
+        count += len(rows)
+        test.process(rows[:, 0], rows[:, 1:])
+        resampler = acquisition.resampler
+        acquisition.remove_finished()
+        time.sleep(0.01)
+
+    assert count == 6000
+    assert resampler.dropped == 0
+    assert test.result[2:] == score_recording(path)[2:]
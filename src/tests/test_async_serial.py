@@ -0,0 +1,38 @@
+import os
+import threading
+import time
+import numpy as np
+import pytest
+from utils.async_serial import AsyncSerialHub, AsyncSerialReader
+from utils.sources import SerialSource
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'openpty'), reason="needs a pseudo terminal")
+
+
+def test_slow_consumer_pauses_the_port_instead_of_losing_samples():
+    master, slave = os.openpty()
+    source = SerialSource(os.ttyname(slave), 6)
+    source.open()
+    hub = AsyncSerialHub()
+    reader = AsyncSerialReader(hub, source, capacity=256)
+    reader.start()
+    total = 5000
+    data = b''.join(f"{i},0,0,0,0,0\n".encode() for i in range(total))
+    # Blocks whenever the port stops being read and the terminal's buffer fills
+    writer = threading.Thread(target=os.write, args=(master, data), daemon=True)
+    writer.start()
+    try:
+        time.sleep(1.0)  # A consumer stalled far longer than the ring lasts
+        received = []
+        deadline = time.monotonic() + 10.0
+        while sum(map(len, received)) < total and time.monotonic() < deadline:
+            received.append(reader.ring.read()[:, 1])
+            time.sleep(0.01)
+        received = np.concatenate(received)
+        assert received.tolist() == list(range(total))
+        assert reader.ring.overruns == 0
+    finally:
+        reader.stop()
+        hub.stop()
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,53 @@
+import numpy as np
+from utils.frame_protocol import FrameDecoder, encode_frame
+
+
+def frames(count, num_values=6):
+    values = np.arange(count * num_values, dtype=float).reshape(count, num_values) / 10
+    return [encode_frame(i, 10 * i, values[i]) for i in range(count)], values
+
+
+def decode(decoder, chunks):
+    results = [decoder.feed(chunk) for chunk in chunks]
+    return np.concatenate([seq for seq, _, _ in results]), np.concatenate([values for _, _, values in results])
+
+
+def test_round_trip():
+    encoded, values = frames(100)
+    decoder = FrameDecoder(6)
+    seq, decoded = decode(decoder, [b''.join(encoded)])
+    assert seq.tolist() == list(range(100))
+    assert np.allclose(decoded, values)
+    assert (decoder.crc_errors, decoder.lost_frames, decoder.dropped_bytes) == (0, 0, 0)
+
+
+def test_bad_frame_is_counted_once_when_more_data_follows():
+    encoded, _ = frames(3)
+    corrupted = bytearray(encoded[1])
+    corrupted[-1] ^= 0xFF
+    stream = encoded[0] + bytes(corrupted) + encoded[2]
+    decoder = FrameDecoder(6)
+    split = len(encoded[0]) + len(corrupted) + 5  # Part way into the last frame
+    seq, _ = decode(decoder, [stream[:split], stream[split:]])
+    assert seq.tolist() == [0, 2]
+    assert decoder.crc_errors == 1
+
+
+def test_chunked_decoding_matches_whole_decoding():
+    rng = np.random.default_rng(0)
+    encoded, _ = frames(500)
+    stream = bytearray(b''.join(encoded))
+    for position in rng.choice(len(stream), 40, replace=False):
+        stream[position] ^= 0xFF
+    stream = bytes(stream)
+
+    whole = FrameDecoder(6)
+    whole_seq, whole_values = decode(whole, [stream])
+    cuts = np.sort(rng.choice(np.arange(1, len(stream)), 300, replace=False))
+    chunked = FrameDecoder(6)
+    chunked_seq, chunked_values = decode(chunked, [stream[a:b] for a, b in zip([0, *cuts], [*cuts, len(stream)])])
+
+    assert chunked_seq.tolist() == whole_seq.tolist()
+    assert np.array_equal(chunked_values, whole_values)
+    assert chunked.crc_errors == whole.crc_errors
+    assert chunked.dropped_bytes == whole.dropped_bytes
@@ -0,0 +1,19 @@
+import numpy as np
+from utils.orientation import euler_to_quaternion, quaternion_to_euler, relative_orientation
+
+
+def test_euler_round_trip():
+    angles = np.array([[10.0, -20.0, 30.0], [-170.0, 45.0, 90.0]])
+    assert np.allclose(quaternion_to_euler(euler_to_quaternion(angles)), angles)
+
+
+def test_angle_between_segments():
+    orientations = np.array([
+        [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+        [10.0, 20.0, 0.0, 10.0, 20.0, 0.0],
+        [0.0, 0.0, 0.0, 30.0, 0.0, 0.0],
+        [5.0, 0.0, 0.0, 5.0, 30.0, 0.0],
+    ])
+    relative = relative_orientation(orientations)
+    assert np.allclose(relative[:, 3], [0.0, 0.0, 30.0, 30.0], atol=1e-4)
+    assert np.allclose(relative[2, :3], [30.0, 0.0, 0.0])
@@ -0,0 +1,20 @@
+from utils.results_store import ResultsStore
+
+
+def test_append_load_and_replace(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results.db'), legacy_path=None)
+    store.append(['Left Ankle', 'Mon Apr 7 21:25:00 2025', 120.5, [60.0, 60.5]], 'tests/a.rec')
+    store.append(['Right Ankle', 'Tue Apr 8 09:00:00 2025', 99.0, [99.0]])
+    assert store.load_all() == [
+        ['Left Ankle', 'Mon Apr 7 21:25:00 2025', 120.5, [60.0, 60.5]],
+        ['Right Ankle', 'Tue Apr 8 09:00:00 2025', 99.0, [99.0]],
+    ]
+
+    replaced = store.replace_recorded([
+        (['Left Ankle', 'Mon Apr 7 21:25:00 2025', 130.0, [65.0, 65.0]], 'tests/a.rec'),
+        (['Left Elbow', 'Wed Apr 9 10:00:00 2025', 50.0, [50.0]], 'tests/b.rec'),
+    ])
+    assert replaced == 1
+    assert store.count() == 3
+    assert store.load_all()[0][2:] == [130.0, [65.0, 65.0]]
+    store.close()
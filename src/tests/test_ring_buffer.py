@@ -0,0 +1,34 @@
+import threading
+import numpy as np
+from utils.ring_buffer import RingBuffer
+
+
+def test_rows_overwritten_during_a_read_are_dropped():
+    ring = RingBuffer(4, 1)
+    ring.write(np.arange(4.0)[:, None])
+    # The writer has announced and copied in two new rows but not yet published them
+    ring.writing_to = 6
+    ring.data[0:2] = [[4.0], [5.0]]
+    assert ring.read()[:, 0].tolist() == [2.0, 3.0]
+    assert ring.overruns == 2
+
+
+def test_lagging_reader_sees_every_row_in_order_or_counts_it():
+    ring = RingBuffer(64, 1)
+    total = 200000
+    done = threading.Event()
+
+    def produce():
+        for start in range(0, total, 50):
+            ring.write(np.arange(start, start + 50, dtype=float)[:, None])
+        done.set()
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    received = []
+    while not done.is_set() or len(ring):
+        received.append(ring.read()[:, 0])
+    thread.join()
+    received = np.concatenate(received)
+    assert np.all(np.diff(received) > 0)
+    assert len(received) + ring.overruns == total
@@ -0,0 +1,23 @@
+import numpy as np
+from utils.scoring import MobilityTest
+
+
+def test_batches_score_like_one_pass_and_only_scored_channels_count():
+    rng = np.random.default_rng(0)
+    times = np.arange(1500) / 100.0
+    samples = np.cumsum(rng.normal(0, 1, (1500, 10)), axis=0)
+
+    whole = MobilityTest('Left Ankle', 10, scored_values=6)
+    result = whole.process(times, samples)
+    batched = MobilityTest('Left Ankle', 10, scored_values=6)
+    for start in range(0, 1500, 7):
+        batched_result = batched.process(times[start:start + 7], samples[start:start + 7])
+        if batched_result is not None:
+            break
+
+    assert batched_result[2:] == result[2:]
+    assert len(result[3]) == 6
+    assert len(whole.unscored_max_differences()) == 4
+    # The sample that reaches 10s is the last one scored
+    expected = np.abs(samples[:1001, :6] - samples[0, :6]).max(axis=0).round(1)
+    assert result[3] == expected.tolist()
@@ -0,0 +1,22 @@
+from utils.serial_utils import LineAssembler, parse_csv_lines
+
+
+def test_parses_a_block_of_lines():
+    samples, malformed = parse_csv_lines([b'1,2,3', b'-4.5,5,6.25'], 3)
+    assert samples.tolist() == [[1, 2, 3], [-4.5, 5, 6.25]]
+    assert malformed == 0
+
+
+def test_rejects_malformed_lines_instead_of_truncating_them():
+    lines = [b'1,2,3', b'4,5,1.2.3', b'4,5,6-', b'7,8', b'1,2,nan', b'x,y,z', b'9,9,9']
+    samples, malformed = parse_csv_lines(lines, 3)
+    assert samples.tolist() == [[1, 2, 3], [9, 9, 9]]
+    assert malformed == 5
+
+
+def test_line_assembler_carries_partial_lines_and_drops_overlong_ones():
+    assembler = LineAssembler(max_line_length=8)
+    assert assembler.feed(b'1,2,3\r\n4,5') == [b'1,2,3']
+    assert assembler.feed(b',6\n' + b'9' * 20 + b'\n') == [b'4,5,6']
+    assert assembler.dropped == 1
+    assert parse_csv_lines(assembler.feed(b'7,8,9\n'), 3)[0].tolist() == [[7, 8, 9]]
@@ -0,0 +1,49 @@
+import multiprocessing
+import time
+import numpy as np
+from utils.shared_ring import SharedRing
+
+WIDTH = 8
+
+
+def lagging_consumer(name, results):
+    """Reads an attached ring slowly; every frame holds its own index in every column."""
+    ring = SharedRing.attach(name)
+    cursor = ring.cursor()
+    start = cursor.position
+    received, torn, out_of_order, last = 0, 0, 0, -1.0
+    results.put('ready')
+    while True:
+        closed = ring.closed
+        rows = cursor.read()
+        torn += int(np.count_nonzero((rows != rows[:, :1]).any(axis=1)))
+        indices = np.concatenate(([last], rows[:, 0]))
+        out_of_order += int(np.count_nonzero(np.diff(indices) <= 0))
+        if len(rows):
+            last = rows[-1, 0]
+        received += len(rows)
+        if closed:
+            break
+        time.sleep(0.0005)
+    results.put((start, received, cursor.overruns, torn, out_of_order))
+    ring.close()
+
+
+def test_attached_consumer_never_sees_torn_frames():
+    ring = SharedRing(256, WIDTH)
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    consumer = context.Process(target=lagging_consumer, args=(ring.name, results))
+    consumer.start()
+    assert results.get(timeout=30) == 'ready'
+
+    total = 200000
+    for start in range(0, total, 200):
+        ring.write(np.repeat(np.arange(start, start + 200, dtype=float)[:, None], WIDTH, axis=1))
+    ring.close()  # The consumer keeps its mapping until it is done
+    start, received, overruns, torn, out_of_order = results.get(timeout=30)
+    consumer.join(timeout=10)
+
+    assert torn == 0
+    assert out_of_order == 0
+    assert received + overruns == total - start
@@ -0,0 +1,25 @@
+import numpy as np
+from utils.stats import StreamingStats
+
+
+def test_batches_match_the_whole_stream():
+    rng = np.random.default_rng(0)
+    samples = rng.normal(10.0, 30.0, (10000, 4))
+    stats = StreamingStats(4)
+    for batch in np.array_split(samples, 37):
+        stats.update(batch)
+    assert stats.count == len(samples)
+    assert np.allclose(stats.mean, samples.mean(axis=0))
+    assert np.allclose(stats.std, samples.std(axis=0))
+    assert np.array_equal(stats.minimum, samples.min(axis=0))
+    assert np.array_equal(stats.maximum, samples.max(axis=0))
+    assert np.allclose(stats.percentile(95), np.percentile(samples, 95, axis=0), atol=0.2)
+
+
+def test_robust_range_ignores_a_spike():
+    samples = np.tile(np.linspace(-10.0, 10.0, 1000), (1, 1)).T
+    samples[500] = 300.0
+    stats = StreamingStats(1)
+    stats.update(samples)
+    assert stats.range[0] > 300
+    assert abs(stats.robust_range()[0] - 18.0) < 0.5
@@ -0,0 +1,212 @@
+import logging
+import numpy as np
+from .alignment import Resampler
+from .orientation import RELATIVE_LABELS, relative_orientation
+
+logger = logging.getLogger(__name__)
+
+SENSOR_PAIR_VALUES = 6  # Roll, pitch and yaw of two sensors, as the dual sensor boards send
+
+
+class AcquisitionManager:
+    """Runs one reader worker per device and merges their samples onto a common host timeline.
+
+    Every reader publishes rows of ``[time, values...]`` through its own ring
+    buffer. ``read`` drains all of them and returns rows of
+    ``[time, group 1 values..., group 2 values...]`` in time order, where each
+    device's values are held between its own samples. Devices are exposed as
+    named channel groups in the order they were added; a device whose source
+    carries several groups, such as a daemon feed, is exposed as those, and
+    any derived groups it brings are moved after every device's own values.
+
+    With a ``resample_rate`` every device is instead interpolated onto a
+    shared uniform grid at that rate, which makes samples from different
+    boards and sessions directly comparable.
+
+    With ``relative_angles`` every device sending two sensors' orientations
+    also gets a derived ``"<name> Joint"`` group after all device groups,
+    holding the orientation of its second sensor relative to its first and
+    the angle between them. Unless the device's source sends a real yaw
+    angle, yaw is left out and only roll and pitch are compared.
+    """
+
+    def __init__(self, resample_rate=None, relative_angles=False):
+        self.devices = {}  # Device name -> reader thread
+        self.last_values = {}  # Device name -> most recent values, NaN until it reports
+        self.finished = []  # Devices whose reader stopped, drained but not yet removed
+        self.resample_rate = resample_rate
+        self.resampler = None  # Rebuilt whenever the set of devices changes
+        self.order = None  # Column order when a device brings derived groups, see column_order
+        self.relative_angles = relative_angles
+
+    @property
+    def channel_groups(self):
+        """List of ``(name, num_values)`` for each device's own groups, then for each derived group."""
+        own, derived = [], []
+        for name, reader in self.devices.items():
+            device_own, device_derived = self.device_groups(name, reader)
+            own += device_own
+            derived += device_derived
+        return own + derived + [(f"{name} Joint", len(RELATIVE_LABELS)) for name in self.sensor_pairs()]
+
+    @property
+    def group_labels(self):
+        """Channel labels for groups whose channels are not plain sensor values."""
+        labels = {}
+        for reader in self.devices.values():
+            labels.update(reader.source.group_labels)
+        labels.update({f"{name} Joint": RELATIVE_LABELS for name in self.sensor_pairs()})
+        return labels
+
+    @property
+    def num_values(self):
+        return sum(num_values for _, num_values in self.channel_groups)
+
+    @property
+    def device_values(self):
+        """Number of the devices' own values, which come before any derived groups."""
+        return sum(num_values for name, reader in self.devices.items()
+                   for _, num_values in self.device_groups(name, reader)[0])
+
+    def device_groups(self, name, reader):
+        """Returns a device's ``(own, derived)`` channel groups, in the order it sends them."""
+        groups = reader.source.channel_groups
+        if not groups:
+            return [(name, reader.num_values)], []
+        scored_values = reader.num_values if reader.source.scored_values is None else reader.source.scored_values
+        own, total = [], 0
+        for group in groups:
+            if total >= scored_values:
+                break
+            own.append(group)
+            total += group[1]
+        return own, groups[len(own):]
+
+    def column_order(self):
+        """Indices moving the derived values a device brings after every device's own, or None if in order."""
+        own, derived, column = [0], [], 1
+        for name, reader in self.devices.items():
+            own_values = sum(num_values for _, num_values in self.device_groups(name, reader)[0])
+            own.extend(range(column, column + own_values))
+            derived.extend(range(column + own_values, column + reader.num_values))
+            column += reader.num_values
+        order = own + derived + list(range(column, column + len(self.sensor_pairs()) * len(RELATIVE_LABELS)))
+        return None if order == list(range(len(order))) else np.array(order)
+
+    def sensor_pairs(self):
+        if not self.relative_angles:
+            return []
+        # A daemon feed arrives with the daemon's own joint groups already derived
+        return [name for name, reader in self.devices.items()
+                if reader.num_values == SENSOR_PAIR_VALUES and not reader.source.channel_groups]
+
+    def add_device(self, name, reader):
+        """Starts a reader and adds its channels as a new group."""
+        if name in self.devices:
+            raise ValueError(f"A device named {name} is already connected")
+        self.devices[name] = reader
+        self.last_values[name] = np.full(reader.num_values, np.nan)
+        self.resampler = None
+        self.order = self.column_order()
+        reader.start()
+
+    def remove_device(self, name):
+        reader = self.devices.pop(name)
+        self.last_values.pop(name)
+        self.resampler = None
+        self.order = self.column_order()
+        if name in self.finished:
+            self.finished.remove(name)
+        reader.stop()
+        return reader
+
+    def remove_finished(self):
+        """Removes devices whose reader has stopped; returns ``(name, error)`` for each."""
+        removed = []
+        for name in list(self.finished):
+            reader = self.remove_device(name)
+            removed.append((name, reader.error))
+        return removed
+
+    def stop_all(self):
+        for name in list(self.devices):
+            self.remove_device(name)
+
+    def is_alive(self):
+        return any(reader.is_alive() for reader in self.devices.values())
+
+    def read(self):
+        """Drains every device and returns the merged rows."""
+        if not self.devices:
+            return np.empty((0, 1))
+        batches = []
+        for name, reader in self.devices.items():
+            # Check first so rows written just before a thread exits are still drained
+            alive = reader.is_alive()
+            batches.append(reader.ring.read())
+            if not alive and name not in self.finished:
+                self.finished.append(name)
+
+        if self.resample_rate:
+            if self.resampler is None:
+                self.resampler = Resampler([reader.num_values for reader in self.devices.values()], self.resample_rate)
+            rows = self.resampler.process(batches)
+        elif len(batches) == 1:
+            rows = batches[0]
+        else:
+            rows = self.merge(batches)
+        rows = self.add_relative_angles(rows)
+        if self.order is not None:
+            rows = rows[:, self.order]
+        if len(rows) and logger.isEnabledFor(logging.DEBUG):
+            # Rate limited by the logging setup, so this is safe at any sample rate
+            logger.debug("Processed data", extra={'rows': len(rows), 'sample_time': float(rows[-1, 0]),
+                                                  'values': rows[-1, 1:].round(2).tolist()})
+        return rows
+
+    def add_relative_angles(self, rows):
+        """Appends the derived joint channels, computed for the whole batch at once."""
+        pairs = self.sensor_pairs()
+        if not pairs:
+            return rows
+        derived, column = [], 1
+        for name, reader in self.devices.items():
+            if name in pairs:
+                orientations = rows[:, column:column + SENSOR_PAIR_VALUES]
+                if not reader.source.yaw_is_angle:
+                    # The firmware sends the gyroscope's z rate as yaw, which is no rotation
+                    orientations = orientations.copy()
+                    orientations[:, 2::3] = 0.0
+                derived.append(relative_orientation(orientations))
+            column += reader.num_values
+        return np.hstack([rows] + derived)
+
+    def merge(self, batches):
+        widths = [reader.num_values for reader in self.devices.values()]
+        merged_width = 1 + sum(widths)
+        if not any(len(rows) for rows in batches):
+            return np.empty((0, merged_width))
+
+        times = np.concatenate([rows[:, 0] for rows in batches])
+        sources = np.concatenate([np.full(len(rows), index) for index, rows in enumerate(batches)])
+        order = np.argsort(times, kind='stable')  # Stable keeps each device's own order
+        sources = sources[order]
+
+        merged = np.empty((len(times), merged_width))
+        merged[:, 0] = times[order]
+        column = 1
+        for index, (name, rows) in enumerate(zip(self.devices, batches)):
+            width = widths[index]
+            mine = sources == index
+            if len(rows):
+                # Index of this device's latest row at or before every merged row, -1 before its first
+                latest = np.maximum.accumulate(np.where(mine, np.cumsum(mine) - 1, -1))
+                held = np.vstack((self.last_values[name], rows[:, 1:]))
+                merged[:, column:column + width] = held[latest + 1]
+                self.last_values[name] = rows[-1, 1:]
+            else:
+                merged[:, column:column + width] = self.last_values[name]
+            column += width
+
+        # Rows from before every device has reported cannot be scored or plotted
+        return merged[~np.isnan(merged).any(axis=1)]
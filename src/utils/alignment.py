@@ -0,0 +1,135 @@
+import numpy as np
+
+
+class ClockEstimator:
+    """Maps a device's millisecond timestamps onto the host clock.
+
+    Frames reach the host some unknown but never negative time after the
+    device stamped them, so over a sliding window the drift is taken from a
+    straight-line fit of arrival against device time and the offset from the
+    lower envelope of the residuals, i.e. the least delayed frames.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.device_times = np.empty(0)
+        self.arrival_times = np.empty(0)
+        self.last_raw = None
+        self.wraps = 0
+        self.drift = 1.0  # Host seconds per device second
+        self.offset = 0.0
+
+    def unwrap(self, device_ms):
+        """Converts uint32 millis() values to seconds, following the counter across wrap-arounds."""
+        raw = np.asarray(device_ms, dtype=np.int64)
+        previous = raw[0] if self.last_raw is None else self.last_raw
+        steps = np.diff(raw, prepend=previous)
+        wraps = self.wraps + np.cumsum(steps < -(1 << 31))
+        self.last_raw = int(raw[-1])
+        self.wraps = int(wraps[-1])
+        return (raw + wraps * (1 << 32)) / 1000.0
+
+    def update(self, device_ms, arrival_time):
+        """Adds a batch that arrived at ``arrival_time`` and returns its host timestamps."""
+        if len(device_ms) == 0:
+            return np.empty(0)
+        device_times = self.unwrap(device_ms)
+        self.device_times = np.concatenate((self.device_times, device_times))[-self.window:]
+        self.arrival_times = np.concatenate((self.arrival_times, np.full(len(device_times), arrival_time)))[-self.window:]
+
+        # Wait for a second of history before trusting a drift estimate
+        if self.device_times[-1] - self.device_times[0] >= 1.0:
+            self.drift = np.polyfit(self.device_times - self.device_times[0], self.arrival_times, 1)[0]
+        self.offset = np.min(self.arrival_times - self.drift * self.device_times)
+        return self.offset + self.drift * device_times
+
+
+def spread_arrivals(count, arrival_time, previous_arrival, sample_period):
+    """Timestamps for ``count`` samples that arrived together, spaced back from ``arrival_time``.
+
+    Used for streams that carry no device time. The samples are assumed to have
+    been produced since the previous read, but no faster than ``sample_period``.
+    """
+    start = arrival_time - count * sample_period
+    if previous_arrival is not None:
+        start = max(start, previous_arrival)
+    return start + (arrival_time - start) * np.arange(1, count + 1) / count
+
+
+class Resampler:
+    """Resamples several timestamped streams onto one uniform time grid.
+
+    Each call takes one batch of ``[time, values...]`` rows per stream and
+    returns ``[time, stream 1 values..., stream 2 values...]`` rows for every
+    grid point that all streams have already passed, linearly interpolated.
+    Rows still needed to interpolate later grid points are carried over.
+
+    A stream whose newest sample is more than ``stale_after`` seconds behind
+    the newest of any stream no longer holds the grid back and its last value
+    is held, so one quiet device cannot stall the others. Like merged rows,
+    no grid points are produced until every stream has sent its first
+    sample, so none is ever filled with a made-up value. However large a
+    batch, the grid is produced first and only rows still needed afterwards
+    count towards ``max_pending`` per stream; past that the oldest are
+    dropped and counted in ``dropped``.
+    """
+
+    def __init__(self, widths, rate, stale_after=0.5, max_pending=4096):
+        self.widths = widths
+        self.period = 1.0 / rate
+        self.stale_after = stale_after
+        self.max_pending = max_pending
+        self.pending = [np.empty((0, 1 + width)) for width in widths]
+        self.last_times = [None] * len(widths)  # Newest sample time per stream
+        self.next_time = None
+        self.dropped = 0
+
+    def process(self, batches):
+        for i, rows in enumerate(batches):
+            if len(rows):
+                self.pending[i] = np.concatenate((self.pending[i], rows))
+                self.last_times[i] = self.pending[i][-1, 0]
+
+        output = self.resample()
+        # Only rows that could not be used yet count against the limit
+        for i, rows in enumerate(self.pending):
+            if len(rows) > self.max_pending:
+                self.dropped += len(rows) - self.max_pending
+                self.pending[i] = rows[-self.max_pending:]
+        return output
+
+    def resample(self):
+        empty = np.empty((0, 1 + sum(self.widths)))
+        if any(time is None for time in self.last_times):
+            # Nothing before every stream has reported can be produced, so only the latest row is worth keeping
+            self.pending = [rows[-1:] for rows in self.pending]
+            return empty
+        newest = max(self.last_times)
+        live = [i for i, time in enumerate(self.last_times) if time >= newest - self.stale_after]
+        if self.next_time is None:
+            start = max(self.pending[i][0, 0] for i in live)
+            self.next_time = np.ceil(start / self.period) * self.period
+        end = min(self.pending[i][-1, 0] for i in live)
+        if end < self.next_time:
+            return empty
+
+        steps = int(np.floor((end - self.next_time) / self.period)) + 1
+        grid = self.next_time + self.period * np.arange(steps)
+        output = [grid[:, None]]
+        for i, rows in enumerate(self.pending):
+            times = np.maximum.accumulate(rows[:, 0])
+            upper = np.clip(np.searchsorted(times, grid, side='left'), 1, len(times) - 1) if len(times) > 1 else np.zeros(len(grid), dtype=int)
+            lower = np.maximum(upper - 1, 0)
+            span = times[upper] - times[lower]
+            weight = np.divide(grid - times[lower], span, out=np.zeros(len(grid)), where=span > 0)
+            # Clipping also holds the last value past the end of a quiet stream
+            weight = np.clip(weight, 0.0, 1.0)[:, None]
+            values = rows[:, 1:]
+            output.append(values[lower] + weight * (values[upper] - values[lower]))
+
+            # Keep the last row at or before the final grid point for the next batch
+            keep_from = max(int(np.searchsorted(times, grid[-1], side='right')) - 1, 0)
+            self.pending[i] = rows[keep_from:]
+
+        self.next_time = grid[-1] + self.period
+        return np.hstack(output)
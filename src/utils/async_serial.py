@@ -0,0 +1,161 @@
+import asyncio
+import concurrent.futures
+import threading
+import serial
+from .sources import SampleReader
+
+
+class AsyncSerialTransport:
+    """Delivers bytes from a pyserial port to asyncio code, waking only when data arrives.
+
+    On POSIX the port's file descriptor is registered with the event loop, so a
+    quiet port costs nothing. Reads of at most ``read_size`` bytes land in a
+    bounded queue; when whoever awaits ``read`` stops calling it and the queue
+    fills, the descriptor is unregistered until half of it was drained,
+    leaving further data in the OS buffer. Where the loop cannot watch the
+    port (Windows) a blocking read in the default executor is used instead and
+    ``queue.put`` applies the same limit.
+    """
+
+    def __init__(self, serial_port, maxsize=64, read_size=1024):
+        self.serial_port = serial_port
+        self.read_size = read_size
+        self.queue = asyncio.Queue(maxsize)
+        self.loop = None
+        self.reading = False
+        self.poller = None
+        self.error = None
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        try:
+            self.serial_port.timeout = 0  # Non-blocking reads, the loop says when data is waiting
+            self.loop.add_reader(self.serial_port.fileno(), self._on_readable)
+            self.reading = True
+        except (AttributeError, NotImplementedError):
+            self.serial_port.timeout = 0.1
+            self.poller = self.loop.create_task(self._poll_in_executor())
+
+    def _on_readable(self):
+        try:
+            data = self.serial_port.read(min(self.serial_port.in_waiting, self.read_size) or 1)
+        except (serial.SerialException, OSError) as e:
+            self._fail(e)
+            return
+        if data:
+            self.queue.put_nowait(data)
+            if self.queue.full():
+                self._pause()
+
+    async def _poll_in_executor(self):
+        try:
+            while True:
+                data = await self.loop.run_in_executor(None, self._blocking_read)
+                if data:
+                    await self.queue.put(data)
+        except (serial.SerialException, OSError) as e:
+            self._fail(e)
+
+    def _blocking_read(self):
+        data = self.serial_port.read(1)
+        if data and self.serial_port.in_waiting:
+            data += self.serial_port.read(min(self.serial_port.in_waiting, self.read_size - 1))
+        return data
+
+    def _pause(self):
+        if self.reading:
+            self.loop.remove_reader(self.serial_port.fileno())
+            self.reading = False
+
+    def _resume(self):
+        if not self.reading and self.poller is None and self.error is None:
+            self.loop.add_reader(self.serial_port.fileno(), self._on_readable)
+            self.reading = True
+
+    def _fail(self, error):
+        self.error = error
+        self._pause()
+        if not self.queue.full():
+            self.queue.put_nowait(None)
+
+    async def read(self):
+        """Returns the next chunk of bytes, raising the port's error once everything before it was read."""
+        if self.error is not None and self.queue.empty():
+            raise self.error
+        data = await self.queue.get()
+        if data is None:
+            raise self.error
+        if self.queue.qsize() <= self.queue.maxsize // 2:
+            self._resume()
+        return data
+
+    def close(self):
+        self._pause()
+        if self.poller is not None:
+            self.poller.cancel()
+
+
+class AsyncSerialHub(threading.Thread):
+    """One asyncio event loop on a background thread that services any number of serial ports."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.loop = asyncio.new_event_loop()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine):
+        """Schedules a coroutine on the hub's loop, starting the loop on first use."""
+        if not self.is_alive():
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def stop(self):
+        if self.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.join(timeout=1.0)
+
+
+class AsyncSerialReader(SampleReader):
+    """Reads an opened SerialSource from a shared AsyncSerialHub instead of a thread of its own.
+
+    The next chunk is only taken from the port once at most half of ``ring``
+    is unread. A consumer that falls behind therefore fills the transport's
+    queue and then the OS buffer, pausing the port, instead of having its
+    unread samples overwritten. At least half the ring is left for one chunk,
+    which at ``read_size`` bytes is far fewer rows than the default capacity.
+    """
+
+    def __init__(self, hub, source, recorder=None, queue_size=64, capacity=8192):
+        super().__init__(source, recorder, capacity)
+        self.hub = hub
+        self.queue_size = queue_size
+        self.future = None
+
+    def start(self):
+        self.future = self.hub.submit(self.serve())
+
+    async def serve(self):
+        transport = AsyncSerialTransport(self.source.serial_port, self.queue_size)
+        transport.start()
+        try:
+            while True:
+                while len(self.ring) > self.ring.capacity // 2:
+                    await asyncio.sleep(0.005)  # Let the consumer catch up
+                self.publish(*self.source.feed(await transport.read()))
+        except (serial.SerialException, OSError) as e:
+            self.error = e
+        finally:
+            transport.close()
+            self.close()
+
+    def is_alive(self):
+        return self.future is not None and not self.future.done()
+
+    def stop(self):
+        """Cancels the reader and waits for it to release the port."""
+        if self.is_alive():
+            self.future.cancel()
+            concurrent.futures.wait([self.future], timeout=1.0)
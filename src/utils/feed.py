@@ -0,0 +1,225 @@
+import asyncio
+import json
+import queue
+import socket
+import struct
+import time
+import numpy as np
+from .sources import Source
+
+# Feed messages are a kind byte and a payload length followed by the payload:
+#
+#   HELLO    JSON {"channel_groups": [[name, num_values], ...], "num_values": n,
+#            "group_labels": {name: [label, ...]}, "scored_values": n,
+#            "shared_ring": name, "wall_clock_offset": seconds}, sent on
+#            connect and whenever devices come or go; group_labels names the
+#            channels of groups such as joint angles, which come after the
+#            first scored_values values, the devices' own. Clients on the
+#            same machine may attach the named SharedRing instead of reading
+#            SAMPLES
+#   SAMPLES  float64 rows of [time, values...], num_values + 1 wide, time
+#            from the daemon's time.monotonic(); add wall_clock_offset for
+#            time.time()
+#   EVENT    JSON object with an "event" key, such as a completed test result
+#   COMMAND  JSON object with a "command" key, sent by clients
+HELLO = b'H'
+SAMPLES = b'S'
+EVENT = b'E'
+COMMAND = b'C'
+DEFAULT_FEED_PORT = 8765
+
+_MESSAGE = struct.Struct('<cI')
+
+
+def encode_message(kind, payload):
+    if not isinstance(payload, bytes):
+        payload = json.dumps(payload).encode('utf-8')
+    return _MESSAGE.pack(kind, len(payload)) + payload
+
+
+def decode_messages(buffer):
+    """Removes every complete message from the front of ``buffer``; returns ``(kind, payload)`` pairs."""
+    messages, position = [], 0
+    while len(buffer) - position >= _MESSAGE.size:
+        kind, length = _MESSAGE.unpack_from(buffer, position)
+        end = position + _MESSAGE.size + length
+        if end > len(buffer):
+            break
+        messages.append((kind, bytes(buffer[position + _MESSAGE.size:end])))
+        position = end
+    del buffer[:position]
+    return messages
+
+
+class FeedServer:
+    """Publishes the merged live stream to any number of local clients over TCP.
+
+    Runs on an AsyncSerialHub's event loop so it costs nothing between
+    batches. A client whose send buffer grows past ``max_buffer`` bytes has
+    sample batches dropped, counted in ``dropped``, rather than holding up the
+    others. Commands from clients are queued on ``commands`` as
+    ``(command, client)`` for the owner to handle on its own thread.
+    """
+
+    def __init__(self, hub, host='127.0.0.1', port=DEFAULT_FEED_PORT, max_buffer=1 << 20):
+        self.hub = hub
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.server = None
+        self.clients = set()
+        self.hello = encode_message(HELLO, {'channel_groups': [], 'num_values': 0, 'group_labels': {}, 'scored_values': 0,
+                                            'shared_ring': None, 'wall_clock_offset': time.time() - time.monotonic()})
+        self.commands = queue.Queue()
+        self.dropped = 0
+
+    def start(self):
+        self.server = self.hub.submit(asyncio.start_server(self._serve_client, self.host, self.port)).result(timeout=5.0)
+
+    async def _serve_client(self, reader, writer):
+        self.clients.add(writer)
+        writer.write(self.hello)
+        try:
+            while True:
+                kind, length = _MESSAGE.unpack(await reader.readexactly(_MESSAGE.size))
+                payload = await reader.readexactly(length)
+                if kind == COMMAND:
+                    self.commands.put((json.loads(payload), writer))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def set_channel_groups(self, channel_groups, shared_ring=None, group_labels=None, scored_values=None):
+        """Announces a new channel layout, and the SharedRing carrying it, to every client.
+
+        Only the first ``scored_values`` values, by default all of them, are the devices' own.
+        """
+        num_values = sum(num_values for _, num_values in channel_groups)
+        self.hello = encode_message(HELLO, {
+            'channel_groups': channel_groups,
+            'num_values': num_values,
+            'group_labels': group_labels or {},
+            'scored_values': num_values if scored_values is None else scored_values,
+            'shared_ring': shared_ring,
+            'wall_clock_offset': time.time() - time.monotonic(),
+        })
+        self._send(self.hello)
+
+    def publish(self, rows):
+        if len(rows):
+            self._send(encode_message(SAMPLES, np.ascontiguousarray(rows, dtype='<f8').tobytes()), droppable=True)
+
+    def send_event(self, event, client=None):
+        """Sends an event to one client, or to all of them when ``client`` is None."""
+        self._send(encode_message(EVENT, event), client=client)
+
+    def _send(self, message, droppable=False, client=None):
+        self.hub.loop.call_soon_threadsafe(self._write, message, droppable, client)
+
+    def _write(self, message, droppable, client):
+        for writer in [client] if client is not None else list(self.clients):
+            if writer.is_closing():
+                continue
+            if droppable and writer.transport.get_write_buffer_size() > self.max_buffer:
+                self.dropped += 1
+                continue
+            writer.write(message)
+
+    def close(self):
+        if self.server is not None:
+            self.hub.loop.call_soon_threadsafe(self.server.close)
+            for writer in list(self.clients):
+                self.hub.loop.call_soon_threadsafe(writer.close)
+
+
+class FeedClient:
+    """Blocking connection to a FeedServer, for analysis scripts and FeedSource."""
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_FEED_PORT, timeout=5.0):
+        self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.buffer = bytearray()
+        self.closed = False
+
+    def command(self, name, **arguments):
+        self.socket.sendall(encode_message(COMMAND, {'command': name, **arguments}))
+
+    def receive(self, timeout):
+        """Returns the messages that arrive within ``timeout`` seconds, as ``(kind, payload)`` pairs.
+
+        Raises EOFError once the server has closed the connection.
+        """
+        if self.closed:
+            raise EOFError
+        self.socket.settimeout(timeout)
+        try:
+            data = self.socket.recv(1 << 16)
+        except socket.timeout:
+            return []
+        if not data:
+            self.closed = True
+        self.buffer += data
+        messages = decode_messages(self.buffer)
+        if self.closed and not messages:
+            raise EOFError
+        return messages
+
+    def close(self):
+        self.socket.close()
+
+
+class FeedSource(Source):
+    """The live stream from a headless daemon, attached as a single device carrying the daemon's channel groups.
+
+    Events from the daemon, such as test results it scored, are kept in
+    ``events``. If the daemon's devices change while attached the layout no
+    longer matches and ``read`` raises ValueError.
+    """
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_FEED_PORT):
+        self.host = host
+        self.port = port
+        self.client = None
+        self.channel_groups = []
+        self.group_labels = {}
+        self.events = []
+        self.description = f"daemon feed {host}:{port}"
+
+    def open(self):
+        self.client = FeedClient(self.host, self.port)
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            try:
+                messages = self.client.receive(max(deadline - time.monotonic(), 0.01))
+            except EOFError:
+                break
+            for kind, payload in messages:
+                if kind == HELLO:
+                    hello = json.loads(payload)
+                    self.channel_groups = [tuple(group) for group in hello['channel_groups']]
+                    self.num_values = hello['num_values']
+                    self.group_labels = hello.get('group_labels', {})
+                    self.scored_values = hello.get('scored_values', self.num_values)
+                    if self.num_values == 0:
+                        raise ValueError("The daemon has no devices connected")
+                    return
+        raise ConnectionError(f"No greeting from the daemon at {self.host}:{self.port}")
+
+    def read(self, timeout):
+        batches = []
+        for kind, payload in self.client.receive(timeout):
+            if kind == SAMPLES:
+                batches.append(np.frombuffer(payload, dtype='<f8').reshape(-1, self.num_values + 1))
+            elif kind == EVENT:
+                self.events.append(json.loads(payload))
+            elif kind == HELLO:
+                raise ValueError("The daemon's devices changed, reconnect to follow them")
+        if not batches:
+            return self.empty()
+        rows = np.concatenate(batches)
+        return rows[:, 0], rows[:, 1:]
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
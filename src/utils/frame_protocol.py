@@ -0,0 +1,150 @@
+import struct
+import numpy as np
+
+# Binary frame sent by the firmware when BINARY_FRAMES is enabled, all fields
+# little-endian:
+#
+#   sync       2 bytes  0xA5 0x5A
+#   version    uint8    FRAME_VERSION
+#   kind       uint8    payload type, KIND_ORIENTATION for roll/pitch/yaw or
+#                       KIND_RAW for accelerometer and gyroscope readings
+#   seq        uint16   frame counter, wraps at 65536
+#   timestamp  uint32   device millis() when the sample was taken
+#   count      uint8    number of channels that follow
+#   values     int16 x count, fixed point (value * FRAME_SCALE, or RAW_SCALES)
+#   crc        uint16   CRC-16/CCITT-FALSE over version..values
+SYNC = b'\xa5\x5a'
+FRAME_VERSION = 1
+KIND_ORIENTATION = 0
+KIND_RAW = 1
+FRAME_SCALE = 100.0  # Hundredths of a degree
+
+# KIND_RAW carries [ax, ay, az, gx, gy, gz] for each sensor, accelerations in
+# hundredths of m/s^2 and rates in thousandths of rad/s
+RAW_VALUES_PER_SENSOR = 6
+RAW_SCALES = np.array([100.0, 100.0, 100.0, 1000.0, 1000.0, 1000.0])
+
+_HEADER = struct.Struct('<2sBBHIB')
+_CRC = struct.Struct('<H')
+
+
+def _crc_table():
+    table = np.zeros(256, dtype=np.uint16)
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table[byte] = crc & 0xFFFF
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16(data):
+    """CRC-16/CCITT-FALSE of a bytes-like object."""
+    crc = 0xFFFF
+    for byte in bytes(data):
+        crc = ((crc << 8) & 0xFFFF) ^ int(_CRC_TABLE[(crc >> 8) ^ byte])
+    return crc
+
+
+def frame_size(num_values):
+    return _HEADER.size + 2 * num_values + _CRC.size
+
+
+def frame_dtype(num_values):
+    """Packed structured dtype matching one frame on the wire."""
+    return np.dtype([
+        ('sync', '<u2'),
+        ('version', 'u1'),
+        ('kind', 'u1'),
+        ('seq', '<u2'),
+        ('timestamp', '<u4'),
+        ('count', 'u1'),
+        ('values', '<i2', (num_values,)),
+        ('crc', '<u2'),
+    ])
+
+
+def encode_frame(seq, timestamp, values, kind=KIND_ORIENTATION, scale=FRAME_SCALE):
+    """Builds one frame, mirroring sendFrame() in the Arduino sketch."""
+    fixed = np.clip(np.round(np.asarray(values, dtype=float) * scale), -32768, 32767).astype('<i2')
+    body = _HEADER.pack(SYNC, FRAME_VERSION, kind, seq & 0xFFFF, timestamp & 0xFFFFFFFF, len(fixed)) + fixed.tobytes()
+    return body + _CRC.pack(crc16(body[len(SYNC):]))
+
+
+class FrameDecoder:
+    """Decodes a stream of binary frames in bulk, carrying partial frames between reads.
+
+    ``scale`` may be one divisor for every value or an array with one per value.
+    """
+
+    def __init__(self, num_values, kind=KIND_ORIENTATION, scale=FRAME_SCALE):
+        self.num_values = num_values
+        self.kind = kind
+        self.scale = scale
+        self.size = frame_size(num_values)
+        self.dtype = frame_dtype(num_values)
+        self.buffer = bytearray()
+        self.checked = 0  # Buffer offset before which every complete candidate was already checked
+        self.last_seq = None
+        self.frames = 0  # Frames decoded successfully
+        self.crc_errors = 0  # Frames with a valid header whose CRC did not match
+        self.dropped_bytes = 0  # Bytes skipped while hunting for a sync word
+        self.lost_frames = 0  # Gaps in the sequence counter
+
+    def feed(self, data):
+        """Adds raw bytes and returns ``(seq, timestamp, values)`` for every complete frame."""
+        self.buffer += data
+        raw = np.frombuffer(self.buffer, dtype=np.uint8)
+        size = self.size
+
+        candidates = np.flatnonzero((raw[:-1] == SYNC[0]) & (raw[1:] == SYNC[1]))
+        complete = candidates[candidates + size <= len(raw)]
+        # Rejected candidates after the last good frame stay buffered; judge each only once
+        next_checked = int(complete[-1]) + 1 if len(complete) else 0
+        complete = complete[complete >= self.checked]
+        rows = raw[complete[:, None] + np.arange(size)]
+
+        # Header checks, then the CRC for all candidate frames at once
+        plausible = (rows[:, 2] == FRAME_VERSION) & (rows[:, 3] == self.kind) & (rows[:, 10] == self.num_values)
+        rows, complete = rows[plausible], complete[plausible]
+        crc = np.full(len(rows), 0xFFFF, dtype=np.uint16)
+        for column in range(len(SYNC), size - _CRC.size):
+            crc = (crc << 8) ^ _CRC_TABLE[(crc >> 8) ^ rows[:, column]]
+        good = crc == (rows[:, -2].astype(np.uint16) | (rows[:, -1].astype(np.uint16) << 8))
+        self.crc_errors += int(np.count_nonzero(~good))
+        rows, complete = rows[good], complete[good]
+
+        # A sync word can appear inside a payload; keep frames that do not overlap
+        if len(complete) > 1 and np.any(np.diff(complete) < size):
+            keep, next_free = [], 0
+            for i, start in enumerate(complete):
+                if start >= next_free:
+                    keep.append(i)
+                    next_free = start + size
+            rows, complete = rows[keep], complete[keep]
+
+        if len(complete):
+            consumed = int(complete[-1]) + size
+        else:
+            # Nothing decodable yet, but anything before the last possible frame start is junk
+            consumed = max(0, len(raw) - size + 1)
+            pending = candidates[candidates + size > len(raw)]
+            if len(pending):
+                consumed = min(consumed, int(pending[0]))
+        self.dropped_bytes += consumed - len(complete) * size
+        self.checked = max(next_checked, self.checked, consumed) - consumed
+        del raw
+        del self.buffer[:consumed]
+
+        records = np.ascontiguousarray(rows).view(self.dtype).reshape(-1)
+        seq = records['seq']
+        if len(seq):
+            previous = (int(seq[0]) - 1) & 0xFFFF if self.last_seq is None else self.last_seq
+            steps = np.diff(seq.astype(np.int64), prepend=previous) % 65536
+            self.lost_frames += int(np.sum(np.maximum(steps - 1, 0)))
+            self.last_seq = int(seq[-1])
+        self.frames += len(records)
+        return seq, records['timestamp'], records['values'] / self.scale
@@ -0,0 +1,53 @@
+import time
+from .stats import StreamingStats
+
+# Pipeline stages, each timed in milliseconds against time.monotonic(), the
+# clock samples are stamped with:
+#
+#   parse    bytes read from the port until they are parsed samples
+#   publish  a sample's timestamp until it is published to the live ring
+#   score    scoring each published batch
+#   render   the newest plotted sample's timestamp until it is drawn
+#
+# publish and render measure how stale a sample is, so they include the
+# time it spent in transit from the board, in ring buffers and in the
+# resampler. For replayed sessions, whose timestamps are in the past, they
+# are meaningless and pile up in the last bin.
+STAGES = ['parse', 'publish', 'score', 'render']
+MAX_LATENCY_MS = 2000.0
+
+
+class LatencyMonitor:
+    """Optional latency histograms for each pipeline stage.
+
+    While ``enabled`` is off, ``record`` returns straight away, so the
+    instrumented code costs one attribute check. Each stage is only recorded
+    from a single thread.
+    """
+
+    def __init__(self, enabled=False, resolution_ms=0.5):
+        self.enabled = enabled
+        self.resolution_ms = resolution_ms
+        self.reset()
+
+    def reset(self):
+        self.stages = {stage: StreamingStats(1, (0.0, MAX_LATENCY_MS), self.resolution_ms) for stage in STAGES}
+
+    def record(self, stage, seconds):
+        """Adds one latency, or an array of them, in seconds."""
+        if self.enabled:
+            self.stages[stage].update(seconds * 1000.0)
+
+    def record_since(self, stage, start):
+        """Adds the time elapsed since ``start``, a time.monotonic() value or array of them."""
+        if self.enabled:
+            self.stages[stage].update((time.monotonic() - start) * 1000.0)
+
+    def summary(self):
+        """Returns ``{stage: (count, p50, p95, p99, max)}`` in milliseconds for every stage with data."""
+        summary = {}
+        for stage, stats in self.stages.items():
+            if stats.count:
+                p50, p95, p99 = (float(stats.percentile(q)[0]) for q in (50, 95, 99))
+                summary[stage] = (stats.count, p50, p95, p99, float(stats.maximum[0]))
+        return summary
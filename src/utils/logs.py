@@ -0,0 +1,115 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+LOG_FILE = 'data/logs/rheumactive.jsonl'
+CONSOLE_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line, including any ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets each call site log at most once per ``interval`` seconds at ``level`` and below.
+
+    Meant for per-sample debug messages in the acquisition loop: they can be
+    left in without flooding the log at 100Hz. The next record let through
+    from a site carries the number it suppressed as ``suppressed``.
+    """
+
+    def __init__(self, interval=1.0, level=logging.DEBUG):
+        super().__init__()
+        self.interval = interval
+        self.level = level
+        self.sites = {}  # (pathname, lineno): [last emitted, suppressed since]
+
+    def filter(self, record):
+        if record.levelno > self.level:
+            return True
+        site = self.sites.setdefault((record.pathname, record.lineno), [0.0, 0])
+        if record.created - site[0] < self.interval:
+            site[1] += 1
+            return False
+        if site[1]:
+            record.suppressed = site[1]
+        site[0], site[1] = record.created, 0
+        return True
+
+
+def setup_logging(level=logging.INFO, path=LOG_FILE, debug_interval=1.0):
+    """Routes every log record through a queue to a background thread.
+
+    Logging calls only filter the record and put it on the queue, so file and
+    console I/O never block the acquisition loop. The listener writes plain
+    text to stderr and, when ``path`` is given, JSON lines to that file.
+    Replaces any handlers installed before, so calling it again never
+    duplicates output.
+    """
+    global _listener
+    stop_logging()
+
+    handlers = []
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    handlers.append(console)
+    if path:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=10 * 1024 * 1024, backupCount=5)
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()  # Unbounded, so putting a record never waits
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(debug_interval))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    logging.captureWarnings(True)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Writes out every queued record and stops the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
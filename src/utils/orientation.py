@@ -0,0 +1,126 @@
+import numpy as np
+
+MAX_CHUNK = 2048  # Longest run solved in closed form before powers of alpha lose precision
+MAX_STEP = 0.1  # Seconds; longer gaps are not integrated across
+
+
+def _linear_recurrence(previous, inputs, alpha):
+    """Solves ``x[k] = alpha * x[k-1] + inputs[k]`` for every row at once, starting from ``previous``.
+
+    Uses ``x[k] = alpha**(k+1) * (previous + sum(alpha**-(j+1) * inputs[j] for j <= k))``,
+    a cumulative sum instead of a Python loop, over chunks short enough that
+    ``alpha**-k`` stays well inside float64 range.
+    """
+    output = np.empty_like(inputs)
+    for start in range(0, len(inputs), MAX_CHUNK):
+        chunk = inputs[start:start + MAX_CHUNK]
+        powers = alpha ** np.arange(1, len(chunk) + 1)[:, None]
+        output[start:start + len(chunk)] = powers * (previous + np.cumsum(chunk / powers, axis=0))
+        previous = output[start + len(chunk) - 1]
+    return output
+
+
+class ComplementaryFilter:
+    """Computes roll, pitch and yaw from raw accelerometer and gyroscope batches.
+
+    Takes rows of ``[ax, ay, az, gx, gy, gz]`` per sensor, accelerations in
+    m/s^2 and rates in rad/s as sent in KIND_RAW frames, and returns rows of
+    ``[roll, pitch, yaw]`` per sensor in degrees, the same layout as the
+    firmware's own orientation output.
+
+    Roll and pitch blend the integrated gyroscope with the accelerometer's
+    gravity direction, ``alpha`` weighting the gyroscope. With no magnetometer
+    yaw is the integrated z rate, so it drifts slowly but is a real angle
+    rather than the rate the firmware used to report. State is kept between
+    batches, so batch boundaries do not change the result.
+    """
+
+    def __init__(self, num_sensors=2, alpha=0.98):
+        self.num_sensors = num_sensors
+        self.alpha = alpha
+        self.angles = None  # (num_sensors, 3) radians, set from the first sample
+        self.last_time = None
+
+    def process(self, timestamps, raw):
+        raw = np.asarray(raw, dtype=float).reshape(len(timestamps), self.num_sensors, 6)
+        if len(raw) == 0:
+            return np.empty((0, 3 * self.num_sensors))
+        accel, gyro = raw[:, :, :3], raw[:, :, 3:]
+
+        accel_roll = np.arctan2(accel[:, :, 1], accel[:, :, 2])
+        accel_pitch = np.arctan2(-accel[:, :, 0], np.hypot(accel[:, :, 1], accel[:, :, 2]))
+        if self.angles is None:
+            self.angles = np.column_stack((accel_roll[0], accel_pitch[0], np.zeros(self.num_sensors)))
+            self.last_time = timestamps[0]
+
+        steps = np.diff(timestamps, prepend=self.last_time)
+        steps = np.where((steps > 0) & (steps <= MAX_STEP), steps, 0.0)[:, None]
+        self.last_time = timestamps[-1]
+
+        # Keep the accelerometer angles continuous with the estimate across +/-180 degrees
+        accel_roll = np.unwrap(np.vstack((self.angles[:, 0], accel_roll)), axis=0)[1:]
+
+        alpha = self.alpha
+        roll = _linear_recurrence(self.angles[:, 0], alpha * gyro[:, :, 0] * steps + (1 - alpha) * accel_roll, alpha)
+        pitch = _linear_recurrence(self.angles[:, 1], alpha * gyro[:, :, 1] * steps + (1 - alpha) * accel_pitch, alpha)
+        yaw = self.angles[:, 2] + np.cumsum(gyro[:, :, 2] * steps, axis=0)
+
+        # Wrap roll back into (-pi, pi] so the estimate never runs away
+        roll = np.angle(np.exp(1j * roll))
+        self.angles = np.column_stack((roll[-1], pitch[-1], yaw[-1]))
+        return np.degrees(np.stack((roll, pitch, yaw), axis=2)).reshape(len(raw), 3 * self.num_sensors)
+
+
+RELATIVE_LABELS = ["Relative Roll", "Relative Pitch", "Relative Yaw", "Joint Angle"]
+
+
+def euler_to_quaternion(angles):
+    """Converts rows of ``[roll, pitch, yaw]`` in degrees to ``[w, x, y, z]`` unit quaternions (ZYX order)."""
+    half = np.radians(angles) / 2
+    cr, cp, cy = np.cos(half).T
+    sr, sp, sy = np.sin(half).T
+    return np.column_stack((
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    ))
+
+
+def quaternion_to_euler(quaternions):
+    """Converts rows of ``[w, x, y, z]`` unit quaternions to ``[roll, pitch, yaw]`` in degrees (ZYX order)."""
+    w, x, y, z = quaternions.T
+    roll = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    pitch = np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0))
+    yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return np.degrees(np.column_stack((roll, pitch, yaw)))
+
+
+def quaternion_multiply(a, b):
+    aw, ax, ay, az = a.T
+    bw, bx, by, bz = b.T
+    return np.column_stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ))
+
+
+def relative_orientation(orientations):
+    """Orientation of sensor 2 relative to sensor 1 for rows of ``[roll1, pitch1, yaw1, roll2, pitch2, yaw2]``.
+
+    Returns rows of ``[roll, pitch, yaw, angle]`` in degrees: the rotation
+    taking the first segment onto the second as Euler angles, and its total
+    angle, i.e. the angle between the limb segments. Unlike subtracting the
+    Euler angles this stays correct when the segments rotate about several
+    axes at once. The firmware's own orientation output sends a rate as
+    yaw, so for those devices AcquisitionManager sets both yaws to 0 first.
+    """
+    orientations = np.asarray(orientations, dtype=float)
+    first = euler_to_quaternion(orientations[:, :3])
+    second = euler_to_quaternion(orientations[:, 3:6])
+    first[:, 1:] *= -1  # Conjugate, the inverse of a unit quaternion
+    relative = quaternion_multiply(first, second)
+    angle = np.degrees(2 * np.arccos(np.clip(np.abs(relative[:, 0]), 0.0, 1.0)))
+    return np.column_stack((quaternion_to_euler(relative), angle))
@@ -0,0 +1,140 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+METRIC_PREFIX = 'rheumactive_stage'
+
+logger = logging.getLogger(__name__)
+
+
+class StageProfiler:
+    """Call counts, time and bytes per pipeline stage, dumped periodically to a file.
+
+    Functions are wrapped with ``profiled(stage)``; while ``enabled`` is off the
+    wrapper costs one attribute check before calling straight through. Stages
+    may be recorded from several threads, e.g. one parse per reader thread, so
+    updates take a lock, but only while enabled.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.interval = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}  # stage: [calls, seconds, bytes]
+            self.started = time.time()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            counters = self.stages.setdefault(stage, [0, 0.0, 0])
+            counters[0] += 1
+            counters[1] += seconds
+
+    def add_bytes(self, stage, count):
+        """Counts ``count`` bytes as processed by ``stage``."""
+        if self.enabled:
+            with self._lock:
+                self.stages.setdefault(stage, [0, 0.0, 0])[2] += count
+
+    def snapshot(self):
+        """Returns ``{stage: {calls, total_s, mean_ms, bytes}}`` sorted by stage."""
+        with self._lock:
+            stages = {stage: list(counters) for stage, counters in self.stages.items()}
+        return {
+            stage: {
+                'calls': calls,
+                'total_s': seconds,
+                'mean_ms': seconds / calls * 1000.0 if calls else 0.0,
+                'bytes': count,
+            }
+            for stage, (calls, seconds, count) in sorted(stages.items())
+        }
+
+    def to_json(self):
+        return json.dumps({'since': self.started, 'updated': time.time(), 'stages': self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        """Formats the counters in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for metric, key, description in (
+            ('calls_total', 'calls', "Calls to each pipeline stage."),
+            ('seconds_total', 'total_s', "Time spent in each pipeline stage."),
+            ('bytes_total', 'bytes', "Bytes processed by each pipeline stage."),
+        ):
+            name = f"{METRIC_PREFIX}_{metric}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f'{name}{{stage="{stage}"}} {counters[key]}' for stage, counters in snapshot.items())
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=None):
+        """Writes the counters to ``path``, as Prometheus text for .prom and .txt files and JSON otherwise.
+
+        The file is replaced in one step, so a scraper never reads half of it.
+        """
+        path = path or self.path
+        text = self.to_prometheus() if os.path.splitext(path)[1] in ('.prom', '.txt') else self.to_json()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w') as file:
+            file.write(text)
+        os.replace(temporary, path)
+
+    def start(self, path, interval=5.0):
+        """Enables profiling and dumps to ``path`` every ``interval`` seconds on a background thread."""
+        self.stop()
+        self.path = path
+        self.interval = interval
+        self.reset()
+        self.enabled = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dump_periodically, name="profiler-dump", daemon=True)
+        self._thread.start()
+
+    def _dump_periodically(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.dump()
+            except OSError as e:
+                logger.warning("Could not write profile to %s: %s", self.path, e)
+
+    def stop(self):
+        """Disables profiling and writes a final dump."""
+        if self._thread is None:
+            return
+        self.enabled = False
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.dump()
+
+
+PROFILER = StageProfiler()
+
+
+def profiled(stage, profiler=PROFILER):
+    """Decorator timing every call of a function as ``stage`` while ``profiler`` is enabled."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
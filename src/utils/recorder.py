@@ -0,0 +1,128 @@
+import glob
+import json
+import os
+import struct
+import time
+import numpy as np
+
+# Session file layout:
+#
+#   header   HEADER_SIZE bytes: magic, format version, channel count, record
+#            count, creation time, then a JSON metadata blob padded with zeros
+#   records  fixed-width RECORD rows of (host time, float32 values)
+#
+# Host times come from time.monotonic(), which never jumps with the wall
+# clock. The metadata's wall_clock_offset converts them to time.time(); files
+# written before it was stored hold time.time() values already.
+#
+# The file is grown in chunks ahead of the writer and the record count in the
+# header is only advanced on flush, so a crash leaves a readable file holding
+# everything up to the last flush.
+MAGIC = b'RHEUMREC'
+FORMAT_VERSION = 1
+HEADER_SIZE = 1024
+RECORDINGS_DIR = 'data/recordings'
+TEST_RECORDINGS_DIR = os.path.join(RECORDINGS_DIR, 'tests')  # The samples behind each test result
+
+_HEADER = struct.Struct('<8sHHQdI')
+
+
+def record_dtype(num_values):
+    return np.dtype([('time', '<f8'), ('values', '<f4', (num_values,))])
+
+
+class SessionRecorder:
+    """Appends every sample with a host timestamp to a preallocated session file."""
+
+    def __init__(self, path, num_values, metadata=None, chunk_records=6000, flush_interval=1.0):
+        self.path = path
+        self.num_values = num_values
+        self.dtype = record_dtype(num_values)
+        metadata = {**(metadata or {}), 'wall_clock_offset': time.time() - time.monotonic()}
+        self.metadata = json.dumps(metadata).encode('utf-8')
+        if _HEADER.size + len(self.metadata) > HEADER_SIZE:
+            raise ValueError("Recording metadata does not fit in the header")
+        self.chunk_records = chunk_records
+        self.flush_interval = flush_interval
+        self.created = time.time()
+        self.count = 0
+        self.allocated = 0
+        self.last_flush = time.monotonic()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'w+b')
+        self.write_header()
+
+    def write_header(self):
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, self.num_values, self.count, self.created, len(self.metadata))
+        self.file.seek(0)
+        self.file.write((header + self.metadata).ljust(HEADER_SIZE, b'\0'))
+
+    def write(self, timestamps, samples):
+        """Appends a batch of samples; ``timestamps`` is one time for the batch or one per sample."""
+        samples = np.atleast_2d(samples)
+        records = np.empty(len(samples), dtype=self.dtype)
+        records['time'] = timestamps
+        records['values'] = samples
+
+        if self.count + len(records) > self.allocated:
+            chunks = -(-(self.count + len(records) - self.allocated) // self.chunk_records)
+            self.allocated += chunks * self.chunk_records
+            self.file.truncate(HEADER_SIZE + self.allocated * self.dtype.itemsize)
+        self.file.seek(HEADER_SIZE + self.count * self.dtype.itemsize)
+        self.file.write(records.tobytes())
+        self.count += len(records)
+
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Makes the records written so far visible to readers of the file."""
+        self.file.flush()
+        self.write_header()
+        self.file.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+        self.file.close()
+
+
+def read_header(path):
+    """Returns the header fields and metadata of a session file as a dict."""
+    with open(path, 'rb') as file:
+        header = file.read(HEADER_SIZE)
+    magic, version, num_values, count, created, metadata_length = _HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a RheumActive recording")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported recording format version {version}")
+    metadata = json.loads(header[_HEADER.size:_HEADER.size + metadata_length])
+    return {'num_values': num_values, 'count': count, 'created': created, 'metadata': metadata}
+
+
+def open_recording(path):
+    """Maps a session file without copying; returns the header and a record array.
+
+    The records have a ``time`` field (host seconds from time.monotonic(),
+    see the file layout above) and a ``values`` field of shape
+    (count, num_values).
+    """
+    header = read_header(path)
+    if header['count'] == 0:
+        return header, np.empty(0, dtype=record_dtype(header['num_values']))
+    records = np.memmap(path, dtype=record_dtype(header['num_values']), mode='r',
+                        offset=HEADER_SIZE, shape=(header['count'],))
+    return header, records
+
+
+def new_recording_path(prefix='session', directory=RECORDINGS_DIR):
+    return os.path.join(directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}.rec")
+
+
+def list_recordings(directory=RECORDINGS_DIR):
+    """Lists recorded session files, newest first."""
+    return sorted(glob.glob(os.path.join(directory, '*.rec')), reverse=True)
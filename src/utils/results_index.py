@@ -0,0 +1,45 @@
+import bisect
+from itertools import count
+from .results_store import parse_result_date
+
+
+class JointResults:
+    """Results for one joint kept sorted by date, plus the running best score."""
+
+    def __init__(self):
+        self.results = []
+        self.keys = []  # Sort keys parallel to results, for bisect
+        self.best = None
+
+
+class ResultsIndex:
+    """In-memory index of test results keyed by joint, maintained incrementally on insert."""
+
+    def __init__(self, results=()):
+        self.joints = {}
+        self._order = count()  # Keeps results with equal dates in the order they were added
+        for result in results:
+            self.add(result)
+
+    def add(self, result):
+        entry = self.joints.setdefault(result[0], JointResults())
+        timestamp = parse_result_date(result[1])
+        key = (float('inf') if timestamp is None else timestamp, next(self._order))
+        # Results normally arrive in date order, which makes this an append
+        position = bisect.bisect_right(entry.keys, key)
+        entry.keys.insert(position, key)
+        entry.results.insert(position, result)
+        if entry.best is None or result[2] > entry.best[2]:
+            entry.best = result
+
+    def results_for_joint(self, joint):
+        """Returns the joint's results, oldest first. The list is live and must not be modified."""
+        entry = self.joints.get(joint)
+        return entry.results if entry else []
+
+    def best_for_joint(self, joint):
+        entry = self.joints.get(joint)
+        return entry.best if entry else None
+
+    def __len__(self):
+        return sum(len(entry.results) for entry in self.joints.values())
@@ -0,0 +1,114 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+RESULTS_DB = 'data/test_results.db'
+LEGACY_RESULTS_JSON = 'data/test_results.json'
+
+
+def parse_result_date(date):
+    """Converts a QDateTime.toString() date such as 'Mon Apr 7 21:25:00 2025' to epoch seconds."""
+    try:
+        return datetime.strptime(date, '%a %b %d %H:%M:%S %Y').timestamp()
+    except ValueError:
+        return None
+
+
+def format_result_date(timestamp=None):
+    """Formats epoch seconds, defaulting to now, the way QDateTime.toString() does."""
+    when = datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+    return f"{when:%a %b} {when.day} {when:%H:%M:%S %Y}"
+
+
+class ResultsStore:
+    """Append-only store of test results backed by SQLite in WAL mode.
+
+    Each result is a ``[joint, date, score, max_differences]`` list, the same
+    shape the test tab has always produced. Saving one is a single-row insert
+    regardless of how much history exists, and an interrupted write can never
+    damage earlier results. Results are indexed by joint and date.
+
+    A result may name the recording of the samples it was scored from, and
+    ``replace_recorded`` re-scores such results in place.
+    """
+
+    def __init__(self, path=RESULTS_DB, legacy_path=LEGACY_RESULTS_JSON):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                ' id INTEGER PRIMARY KEY,'
+                ' joint TEXT NOT NULL,'
+                ' date TEXT NOT NULL,'
+                ' timestamp REAL,'
+                ' score REAL NOT NULL,'
+                ' max_diff TEXT NOT NULL)'
+            )
+            self.connection.execute('CREATE INDEX IF NOT EXISTS results_joint_timestamp ON results (joint, timestamp)')
+            columns = [row[1] for row in self.connection.execute('PRAGMA table_info(results)')]
+            if 'recording' not in columns:
+                # Databases from before results were linked to their recordings
+                self.connection.execute('ALTER TABLE results ADD COLUMN recording TEXT')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS results_recording ON results (recording)')
+
+        if legacy_path and os.path.exists(legacy_path) and self.count() == 0:
+            self.import_json(legacy_path)
+
+    def import_json(self, path):
+        """Imports results from the old data/test_results.json array in one transaction."""
+        with open(path, 'r') as file:
+            results = json.load(file)
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO results (joint, date, timestamp, score, max_diff) VALUES (?, ?, ?, ?, ?)',
+                [self._row(result) for result in results],
+            )
+
+    def append(self, result, recording=None):
+        """Atomically appends one result, optionally linked to the recording it was scored from."""
+        with self.connection:
+            self.connection.execute(
+                'INSERT INTO results (joint, date, timestamp, score, max_diff, recording) VALUES (?, ?, ?, ?, ?, ?)',
+                self._row(result) + (recording,),
+            )
+
+    def replace_recorded(self, results):
+        """Stores re-scored ``(result, recording)`` pairs in one transaction.
+
+        A result already linked to the recording gets the new score and max
+        differences; any other is appended. Returns the number replaced.
+        """
+        replaced = 0
+        with self.connection:
+            for result, recording in results:
+                joint, date, timestamp, score, max_diff = self._row(result)
+                cursor = self.connection.execute(
+                    'UPDATE results SET score = ?, max_diff = ? WHERE recording = ?', (score, max_diff, recording)
+                )
+                if cursor.rowcount:
+                    replaced += 1
+                else:
+                    self.connection.execute(
+                        'INSERT INTO results (joint, date, timestamp, score, max_diff, recording) VALUES (?, ?, ?, ?, ?, ?)',
+                        (joint, date, timestamp, score, max_diff, recording),
+                    )
+        return replaced
+
+    def load_all(self):
+        """Returns every result in the order it was saved."""
+        rows = self.connection.execute('SELECT joint, date, score, max_diff FROM results ORDER BY id')
+        return [[joint, date, score, json.loads(max_diff)] for joint, date, score, max_diff in rows]
+
+    def count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def _row(self, result):
+        joint, date, score, max_diff = result[:4]
+        return joint, date, parse_result_date(date), score, json.dumps(max_diff)
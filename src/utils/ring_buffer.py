@@ -0,0 +1,89 @@
+import numpy as np
+
+class RingBuffer:
+    """Preallocated single-producer/single-consumer ring of fixed-width rows.
+
+    The writer thread only ever advances ``write_index`` and the reader thread
+    only ever advances ``read_index``, so no lock is needed between them. Both
+    indices count rows since creation and are wrapped onto the array on access.
+    Before copying rows in, the writer sets ``writing_to`` to the index it is
+    writing up to, so a reader it laps can tell which rows it overwrote.
+    """
+
+    def __init__(self, capacity, width, dtype=np.float64):
+        self.capacity = capacity
+        self.width = width
+        self.data = np.zeros((capacity, width), dtype=dtype)
+        self.write_index = 0
+        self.writing_to = 0
+        self.read_index = 0
+        self.overruns = 0  # Rows the reader lost because the writer lapped it
+
+    def write(self, rows):
+        """Copies a batch of rows into the ring, overwriting the oldest rows."""
+        rows = np.asarray(rows, dtype=self.data.dtype).reshape(-1, self.width)
+        count = len(rows)
+        if count == 0:
+            return
+        if count > self.capacity:
+            rows = rows[-self.capacity:]
+        # Announce which rows are about to be overwritten before touching them
+        self.writing_to = self.write_index + count
+        start = (self.write_index + count - len(rows)) % self.capacity
+        end = start + len(rows)
+        if end <= self.capacity:
+            self.data[start:end] = rows
+        else:
+            split = self.capacity - start
+            self.data[start:] = rows[:split]
+            self.data[:end - self.capacity] = rows[split:]
+        # Publish only once the rows are in place
+        self.write_index += count
+
+    def read(self):
+        """Returns a copy of every row written since the previous read."""
+        write_index = self.write_index
+        read_index = max(self.read_index, write_index - self.capacity)
+        self.overruns += read_index - self.read_index
+        if write_index == read_index:
+            self.read_index = read_index
+            return self.data[:0].copy()
+
+        start = read_index % self.capacity
+        end = start + (write_index - read_index)
+        if end <= self.capacity:
+            rows = self.data[start:end].copy()
+        else:
+            rows = np.concatenate((self.data[start:], self.data[:end - self.capacity]))
+
+        # Drop any rows the writer started overwriting while they were being copied
+        stale = min(self.writing_to - self.capacity - read_index, len(rows))
+        if stale > 0:
+            rows = rows[stale:]
+            self.overruns += stale
+            read_index += stale
+        self.read_index = write_index
+        return rows
+
+    def latest(self, count=None):
+        """Returns up to ``count`` of the most recent rows, oldest first.
+
+        Unlike ``read`` this does not consume anything, and the result is a
+        view whenever the rows do not wrap around the end of the array.
+        """
+        write_index = self.write_index
+        available = min(write_index, self.capacity)
+        count = available if count is None else min(count, available)
+        end = write_index % self.capacity or (self.capacity if write_index else 0)
+        start = end - count
+        if start >= 0:
+            return self.data[start:end]
+        return np.concatenate((self.data[start:], self.data[:end]))
+
+    def clear(self):
+        self.write_index = 0
+        self.writing_to = 0
+        self.read_index = 0
+
+    def __len__(self):
+        return min(self.write_index - self.read_index, self.capacity)
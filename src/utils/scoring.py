@@ -0,0 +1,115 @@
+import numpy as np
+from .recorder import open_recording
+from .results_store import format_result_date
+from .stats import StreamingStats
+
+TEST_DURATION = 10.0  # Seconds of samples each test covers
+
+
+def calculate_score(max_differences):
+    """Calculates the score (sum of absolute values) from max differences,
+    rounded to one decimal place.
+    """
+    return round(sum(abs(value) for value in max_differences), 1)
+
+
+def group_scores(max_differences, channel_groups):
+    """Splits a test's max differences by device; returns ``(name, score, group max differences)`` for each."""
+    scores, start = [], 0
+    for name, num_values in channel_groups:
+        group_max_diff = max_differences[start:start + num_values]
+        scores.append((name, calculate_score(group_max_diff), group_max_diff))
+        start += num_values
+    return scores
+
+
+class MobilityTest:
+    """One range of motion test on a joint, fed with batches of timestamped samples.
+
+    The first sample is the datum and the test tracks every channel's largest
+    difference from it until ``duration`` seconds of sample time have passed.
+    Timing follows the samples rather than the wall clock, so a replayed
+    session scores exactly like the live one.
+
+    ``stats`` keeps running statistics of every channel over the test, from
+    which ``robust_score`` scores the 5th to 95th percentile range instead,
+    so a single spike cannot inflate it.
+
+    Only the first ``scored_values`` channels, by default all of them, count
+    towards the score and the stored max differences, so results stay
+    comparable with every earlier one. Derived channels after them, such as
+    joint angles, are tracked the same way and reported by
+    ``unscored_max_differences``.
+    """
+
+    def __init__(self, joint, num_values, duration=TEST_DURATION, scored_values=None):
+        self.joint = joint
+        self.num_values = num_values
+        self.scored_values = num_values if scored_values is None else scored_values
+        self.duration = duration
+        self.start_time = None
+        self.datum = None
+        self.max_diff = np.zeros(num_values)
+        self.stats = StreamingStats(num_values)
+        self.result = None
+
+    @property
+    def complete(self):
+        return self.result is not None
+
+    def process(self, timestamps, samples):
+        """Adds a batch; returns the ``[joint, date, score, max_differences]`` result once the test completes."""
+        if self.complete or len(samples) == 0:
+            return None
+        samples = np.asarray(samples, dtype=float)
+        if self.start_time is None:
+            self.start_time = float(timestamps[0])
+            self.datum = samples[0].copy()
+
+        # The sample that reaches the duration still counts towards the test
+        end = int(np.searchsorted(timestamps, self.start_time + self.duration, side='left'))
+        self.stats.update(samples[:end + 1])
+        # The datum lies within every channel's range, so its furthest point is one of the extremes
+        self.max_diff = np.maximum(self.stats.maximum - self.datum, self.datum - self.stats.minimum)
+
+        if end < len(samples):
+            rounded_max_diff = [round(float(diff), 1) for diff in self.max_diff[:self.scored_values]]
+            self.result = [self.joint, format_result_date(), calculate_score(rounded_max_diff), rounded_max_diff]
+            return self.result
+        return None
+
+    def robust_score(self):
+        return calculate_score([round(float(spread), 1) for spread in self.stats.robust_range()[:self.scored_values]])
+
+    def unscored_max_differences(self):
+        return [round(float(diff), 1) for diff in self.max_diff[self.scored_values:]]
+
+
+def recorded_scored_values(metadata, num_values):
+    """How many leading values of a test recording count towards its score.
+
+    Recordings made before this was stored name derived joint groups
+    ``"<device> Joint"`` after the devices' own groups.
+    """
+    if 'scored_values' in metadata:
+        return metadata['scored_values']
+    groups = metadata.get('channel_groups') or []
+    names = {name for name, _ in groups}
+    derived = sum(count for name, count in groups if name.endswith(' Joint') and name[:-len(' Joint')] in names)
+    return num_values - derived
+
+
+def score_recording(path, duration=TEST_DURATION):
+    """Scores a test recording from TestTab or the daemon in one vectorized pass.
+
+    Returns the ``[joint, date, score, max_differences]`` result, dated when
+    the recording was made, or None if it holds less than a whole test.
+    """
+    header, records = open_recording(path)
+    metadata = header['metadata']
+    test = MobilityTest(metadata['joint'], header['num_values'], duration,
+                        recorded_scored_values(metadata, header['num_values']))
+    result = test.process(records['time'], records['values'])
+    if result is not None:
+        result[1] = format_result_date(header['created'])
+    return result
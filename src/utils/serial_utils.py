@@ -1,6 +1,10 @@
+import logging
+import numpy as np
 import serial
 import serial.tools.list_ports
 
+logger = logging.getLogger(__name__)
+
 def list_serial_ports():
     """Lists available serial ports."""
     ports = [port.device for port in serial.tools.list_ports.comports()]
@@ -12,5 +16,88 @@ def connect_serial_port(port_name, baudrate):
         ser = serial.Serial(port_name, baudrate, timeout=0.01)
         return ser
     except Exception as e:
-        print(f"Error connecting to {port_name}: {e}")
-        return None
\ No newline at end of file
+        logger.error("Error connecting to %s: %s", port_name, e)
+        return None
+
+class LineAssembler:
+    """Splits a raw byte stream into complete lines, carrying partial lines between reads.
+
+    Works directly on bytes so nothing has to be decoded per read. A line that
+    grows past ``max_line_length`` without a newline is discarded and counted in
+    ``dropped``; parsers report rejected lines through ``malformed``.
+    """
+
+    def __init__(self, max_line_length=256):
+        self.max_line_length = max_line_length
+        self.partial = bytearray()
+        self.lines = 0  # Complete lines handed out
+        self.dropped = 0  # Overlong lines thrown away
+        self.malformed = 0  # Complete lines the parser could not use
+
+    def feed(self, data):
+        """Adds raw bytes and returns the list of lines they completed, without terminators."""
+        self.partial += data
+        end = self.partial.rfind(b'\n')
+        if end < 0:
+            if len(self.partial) > self.max_line_length:
+                self.dropped += 1
+                self.partial.clear()
+            return []
+
+        lines = []
+        for line in bytes(self.partial[:end]).split(b'\n'):
+            line = line.rstrip(b'\r')
+            if len(line) > self.max_line_length:
+                self.dropped += 1
+            elif line:
+                lines.append(line)
+        del self.partial[:end + 1]
+        self.lines += len(lines)
+        return lines
+
+
+def _parse_fields(data):
+    """Converts comma separated numbers to floats, raising ValueError unless every field is a number.
+
+    Unlike np.fromstring, which stops quietly at the first bad character,
+    a field such as ``1.2.3`` or ``6-`` rejects the whole batch.
+    """
+    return np.array(data.split(b',')).astype(float)
+
+
+def parse_csv_lines(lines, num_values):
+    """Converts a batch of CSV byte lines into an (n, num_values) float array in one pass.
+
+    Lines with the wrong number of fields, unparseable or non-finite values are
+    masked out. Returns the array and the number of lines that were rejected.
+    """
+    if not lines:
+        return np.empty((0, num_values)), 0
+
+    block = b'\n'.join(lines)
+    raw = np.frombuffer(block, dtype=np.uint8)
+    newlines = np.flatnonzero(raw == ord('\n'))
+    commas_before = np.concatenate(([0], np.cumsum(raw == ord(','))))
+    commas = np.diff(commas_before[np.concatenate(([0], newlines, [len(raw)]))])
+    well_formed = commas == num_values - 1
+    if not well_formed.all():
+        block = b'\n'.join(line for line, ok in zip(lines, well_formed) if ok)
+    count = int(np.count_nonzero(well_formed))
+
+    try:
+        values = _parse_fields(block.replace(b'\n', b',')) if count else np.empty(0)
+    except ValueError:
+        values = None
+    if values is not None and values.size == count * num_values:
+        samples = values.reshape(count, num_values)
+    else:
+        # Something in the block did not parse, fall back to masking line by line
+        samples = np.full((count, num_values), np.nan)
+        for i, line in enumerate(block.split(b'\n')):
+            try:
+                samples[i] = _parse_fields(line)
+            except ValueError:
+                continue
+
+    samples = samples[np.isfinite(samples).all(axis=1)]
+    return samples, len(lines) - len(samples)
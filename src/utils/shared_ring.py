@@ -0,0 +1,185 @@
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+# Shared block layout:
+#
+#   header   HEADER_FIELDS int64 values: write index, capacity, width, closed
+#            flag, and the index the producer is writing up to
+#   rows     capacity x width float64 frames of [time, values...]
+#
+# Only the producer writes. Consumers, in this process or any other, keep
+# their own RingCursor, so adding one costs the producer nothing.
+HEADER_FIELDS = 5
+_WRITE_INDEX, _CAPACITY, _WIDTH, _CLOSED, _WRITING_TO = range(HEADER_FIELDS)
+
+
+class SharedRing:
+    """Single-producer ring of fixed-width float64 frames in shared memory.
+
+    The producer creates it and any number of consumers attach by ``name``,
+    including other processes, and read through a RingCursor each. Frames are
+    copied in once by ``write``, with no serialization; consumers in step with
+    the producer read them as views into the shared block, others copy them
+    out and check they were not overwritten meanwhile.
+    """
+
+    def __init__(self, capacity, width, name=None):
+        size = (HEADER_FIELDS + capacity * width) * 8
+        self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.owner = True
+        np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.memory.buf)[:] = (0, capacity, width, 0, 0)
+        self._map()
+
+    @classmethod
+    def attach(cls, name):
+        """Opens a ring created by another process, without taking ownership of it."""
+        ring = cls.__new__(cls)
+        ring.memory = shared_memory.SharedMemory(name=name)
+        # Attaching registers the block with this process's resource tracker,
+        # which would destroy it when this process exits
+        resource_tracker.unregister(ring.memory._name, 'shared_memory')
+        ring.owner = False
+        ring._map()
+        return ring
+
+    def _map(self):
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.memory.buf)
+        self.capacity = int(self.header[_CAPACITY])
+        self.width = int(self.header[_WIDTH])
+        self.data = np.ndarray((self.capacity, self.width), dtype=np.float64,
+                               buffer=self.memory.buf, offset=HEADER_FIELDS * 8)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    @property
+    def write_index(self):
+        return int(self.header[_WRITE_INDEX])
+
+    @property
+    def closed(self):
+        return bool(self.header[_CLOSED])
+
+    def write(self, rows):
+        """Copies a batch of frames in, overwriting the oldest; only the producer may call this."""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.width)
+        count = len(rows)
+        if count == 0:
+            return
+        if count > self.capacity:
+            rows = rows[-self.capacity:]
+        write_index = self.write_index
+        # Announce which frames are about to be overwritten, so copying consumers can tell
+        self.header[_WRITING_TO] = write_index + count
+        start = (write_index + count - len(rows)) % self.capacity
+        end = start + len(rows)
+        if end <= self.capacity:
+            self.data[start:end] = rows
+        else:
+            split = self.capacity - start
+            self.data[start:] = rows[:split]
+            self.data[:end - self.capacity] = rows[split:]
+        # Publish only once the frames are in place
+        self.header[_WRITE_INDEX] = write_index + count
+
+    def latest(self, count=None):
+        """Returns up to ``count`` of the most recent frames, oldest first, as a view when they do not wrap."""
+        write_index = self.write_index
+        available = min(write_index, self.capacity)
+        count = available if count is None else min(count, available)
+        end = write_index % self.capacity or (self.capacity if write_index else 0)
+        start = end - count
+        if start >= 0:
+            return self.data[start:end]
+        return np.concatenate((self.data[start:], self.data[:end]))
+
+    def since(self, start_time):
+        """Returns the held frames timestamped at or after ``start_time``, oldest first.
+
+        Frames are written in time order, so the first column is searched in
+        place and only the returned frames are copied, and only when they wrap.
+        """
+        write_index = self.write_index
+        available = min(write_index, self.capacity)
+        end = write_index % self.capacity or (self.capacity if write_index else 0)
+        start = end - available
+        if start >= 0:
+            held = self.data[start:end]
+            return held[np.searchsorted(held[:, 0], start_time):]
+        older, newer = self.data[start:], self.data[:end]
+        if len(newer) and newer[0, 0] <= start_time:
+            return newer[np.searchsorted(newer[:, 0], start_time):]
+        return np.concatenate((older[np.searchsorted(older[:, 0], start_time):], newer))
+
+    def cursor(self, from_start=False):
+        """A new consumer, positioned at the next frame or at the oldest one still held."""
+        position = max(self.write_index - self.capacity, 0) if from_start else self.write_index
+        return RingCursor(self, position)
+
+    def close(self):
+        """Detaches; the producer also marks the ring closed and frees the block."""
+        if self.memory is None:
+            return
+        if self.owner:
+            self.header[_CLOSED] = 1
+        del self.header, self.data
+        try:
+            self.memory.close()
+        except BufferError:
+            pass  # A consumer still holds a view; the mapping goes when that does
+        if self.owner:
+            self.memory.unlink()
+        self.memory = None
+
+
+class RingCursor:
+    """One consumer's read position in a SharedRing.
+
+    ``read`` returns every frame written since the previous read. Frames the
+    producer overwrote before they were read are skipped and counted in
+    ``overruns``.
+
+    A consumer that runs between the producer's writes, like the GUI's own
+    test on the GUI thread, can take views into the ring, valid until the
+    producer has written another ``capacity`` frames. Any other consumer,
+    and by default every cursor on an attached ring, gets a copy instead:
+    the producer may be overwriting the oldest frames while they are copied,
+    so afterwards any frame it had started to overwrite is dropped as an
+    overrun rather than returned torn.
+    """
+
+    def __init__(self, ring, position):
+        self.ring = ring
+        self.position = position
+        self.overruns = 0
+
+    @property
+    def pending(self):
+        return min(self.ring.write_index - self.position, self.ring.capacity)
+
+    def read(self, copy=None):
+        """Returns the new frames, copied if ``copy`` or, by default, if the ring was attached."""
+        ring = self.ring
+        if copy is None:
+            copy = not ring.owner
+        write_index = ring.write_index
+        position = max(self.position, write_index - ring.capacity)
+        self.overruns += position - self.position
+        self.position = write_index
+        start = position % ring.capacity
+        end = start + (write_index - position)
+        if end <= ring.capacity:
+            rows = ring.data[start:end]
+            if not copy:
+                return rows
+            rows = rows.copy()
+        else:
+            rows = np.concatenate((ring.data[start:], ring.data[:end - ring.capacity]))
+
+        # Drop any frames the producer started overwriting while they were copied
+        stale = min(int(ring.header[_WRITING_TO]) - ring.capacity - position, len(rows))
+        if stale > 0:
+            rows = rows[stale:]
+            self.overruns += stale
+        return rows
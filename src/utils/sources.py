@@ -0,0 +1,314 @@
+import re
+import threading
+import time
+import numpy as np
+import serial
+from .ring_buffer import RingBuffer
+from .frame_protocol import KIND_RAW, RAW_SCALES, RAW_VALUES_PER_SENSOR, FrameDecoder
+from .serial_utils import LineAssembler, connect_serial_port, parse_csv_lines
+from .alignment import ClockEstimator, spread_arrivals
+from .orientation import ComplementaryFilter
+from .recorder import open_recording
+from .scoring import recorded_scored_values
+from .profiler import PROFILER, profiled
+
+_FIELD_LABEL = re.compile(rb'[A-Za-z][A-Za-z0-9]*:')
+
+
+class Source:
+    """A device or file that produces batches of timestamped samples.
+
+    ``open`` acquires the underlying resource and is called by whoever creates
+    the source, so failures surface straight away. ``read`` then returns
+    ``(timestamps, values)`` arrays of shape (n,) and (n, num_values) for
+    whatever became available within ``timeout`` seconds, possibly empty,
+    and raises EOFError once the source is exhausted.
+
+    ``realtime`` sources produce samples at their own pace; the others produce
+    up to ``batch_size`` samples per read as fast as they are consumed.
+    ``yaw_is_angle`` is set when every third value is a real yaw angle; the
+    firmware's own orientation output sends the gyroscope's z rate there.
+    A source carrying several devices' values, such as a daemon feed, lists
+    them as ``channel_groups`` of ``(name, num_values)``, with the channel
+    labels of any group that has its own in ``group_labels``. Only the first
+    ``scored_values`` of those are the devices' own; derived groups such as
+    joint angles follow them.
+    """
+
+    num_values = 0
+    realtime = True
+    batch_size = 1024
+    description = ""
+    yaw_is_angle = False
+    channel_groups = None
+    group_labels = {}
+    scored_values = None
+    latency = None  # LatencyMonitor timing the parse stage, when set
+
+    def open(self):
+        pass
+
+    def read(self, timeout):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def empty(self):
+        return np.empty(0), np.empty((0, self.num_values))
+
+    def counters(self):
+        """Counts of data lost or rejected so far, by name."""
+        return {}
+
+
+class SerialSource(Source):
+    """USB serial board streaming CSV lines or binary frames.
+
+    Binary frames are timed by mapping their device timestamp onto the host
+    clock; CSV lines, which carry no time, are spread evenly over the interval
+    in which they arrived. ``protocol`` is ``'ascii'`` for CSV lines,
+    ``'labelled'`` for CSV lines whose fields carry ``Name:`` prefixes,
+    ``'binary'`` for orientation frames from frame_protocol, or ``'raw'`` for
+    raw IMU frames, which are turned into roll, pitch and yaw on the host.
+    """
+
+    def __init__(self, port_name, num_values, protocol='ascii', baudrate=115200, sample_period=0.01):
+        self.port_name = port_name
+        self.num_values = num_values
+        self.protocol = protocol
+        self.baudrate = baudrate
+        self.sample_period = sample_period  # Nominal firmware rate
+        self.serial_port = None
+        self.decoder = FrameDecoder(num_values) if protocol == 'binary' else None
+        self.orientation = None
+        if protocol == 'raw':
+            # Three angles out for each sensor's six raw readings
+            num_sensors = num_values // 3
+            self.decoder = FrameDecoder(num_sensors * RAW_VALUES_PER_SENSOR, KIND_RAW, np.tile(RAW_SCALES, num_sensors))
+            self.orientation = ComplementaryFilter(num_sensors)
+            self.yaw_is_angle = True
+        self.assembler = LineAssembler(max(256, 16 * num_values))  # Room for a full line of wide values
+        self.clock = ClockEstimator()
+        self.last_arrival = None
+        self.description = port_name
+
+    def open(self):
+        self.serial_port = connect_serial_port(self.port_name, self.baudrate)
+        if self.serial_port is None:
+            raise OSError(f"Could not open {self.port_name}")
+
+    def read(self, timeout):
+        self.serial_port.timeout = timeout
+        # Blocks for at most the timeout when nothing is waiting
+        raw_data = self.serial_port.read(max(1, self.serial_port.in_waiting))
+        return self.feed(raw_data) if raw_data else self.empty()
+
+    @profiled('parse')
+    def feed(self, raw_data, now=None):
+        """Parses raw bytes from the port, which arrived at ``now``, by default the present, into timestamped samples."""
+        if now is None:
+            now = time.monotonic()  # Sample times never jump with the wall clock
+        PROFILER.add_bytes('parse', len(raw_data))
+        if self.decoder is not None:
+            _, device_times, samples = self.decoder.feed(raw_data)
+            timestamps = self.clock.update(device_times, now)
+            if self.orientation is not None:
+                samples = self.orientation.process(timestamps, samples)
+        else:
+            samples = self.parse(self.assembler.feed(raw_data))
+            timestamps = spread_arrivals(len(samples), now, self.last_arrival, self.sample_period)
+        if len(samples):
+            self.last_arrival = now
+            if self.latency is not None:
+                self.latency.record_since('parse', now)
+        return timestamps, samples
+
+    def parse(self, lines):
+        if self.protocol == 'labelled':
+            lines = [_FIELD_LABEL.sub(b'', line) for line in lines]
+        samples, malformed = parse_csv_lines(lines, self.num_values)
+        self.assembler.malformed += malformed
+        return np.round(samples, 1)  # Limit precision to 1 decimal place
+
+    def counters(self):
+        counters = {'dropped lines': self.assembler.dropped, 'malformed lines': self.assembler.malformed}
+        if self.decoder is not None:
+            counters = {
+                'CRC errors': self.decoder.crc_errors,
+                'lost frames': self.decoder.lost_frames,
+                'dropped bytes': self.decoder.dropped_bytes,
+            }
+        return counters
+
+    def close(self):
+        if self.serial_port is not None:
+            self.serial_port.close()
+
+
+class BluetoothSerialSource(SerialSource):
+    """Bluetooth SPP board, such as Arduino_Sketch_Dual_MPU_Diff_BT, paired as a serial port.
+
+    That sketch sends ``Roll1:..,Pitch1:..`` labelled CSV with both sensors'
+    orientation and their differences, nine values, at about 10Hz.
+    """
+
+    def __init__(self, port_name, num_values=9, protocol='labelled', baudrate=115200, sample_period=0.1):
+        super().__init__(port_name, num_values, protocol, baudrate, sample_period)
+        self.description = f"Bluetooth {port_name}"
+
+
+class RecordingSource(Source):
+    """Recorded session file replayed at ``speed`` times real time, or as fast as possible when 0.
+
+    Samples keep their recorded timestamps, so anything scored from a replay is
+    identical at every speed.
+    """
+
+    def __init__(self, path, num_values=None, speed=1.0, batch_size=1024):
+        self.path = path
+        self.num_values = num_values
+        self.speed = speed
+        self.realtime = speed > 0
+        self.batch_size = batch_size
+        self.description = path
+
+    def open(self):
+        header, self.records = open_recording(self.path)
+        metadata = header['metadata']
+        self.yaw_is_angle = metadata.get('yaw_is_angle', False)
+        if len(metadata.get('channel_groups') or []) > 1:
+            # A recorded daemon feed or test keeps its groups, so derived ones are still not scored
+            self.channel_groups = [tuple(group) for group in metadata['channel_groups']]
+            self.group_labels = metadata.get('group_labels', {})
+            self.scored_values = recorded_scored_values(metadata, header['num_values'])
+        if self.num_values is None:
+            self.num_values = header['num_values']
+        elif header['num_values'] != self.num_values:
+            raise ValueError(f"Recording has {header['num_values']} values per sample, expected {self.num_values}")
+        self.times = np.asarray(self.records['time'])
+        self.position = 0
+        self.start_clock = time.monotonic()
+
+    def read(self, timeout):
+        if self.position >= len(self.records):
+            raise EOFError
+        end = self.position + self.batch_size
+        if self.realtime:
+            elapsed = (time.monotonic() - self.start_clock) * self.speed
+            due = int(np.searchsorted(self.times, self.times[0] + elapsed, side='right'))
+            if due <= self.position:
+                wait = (self.times[self.position] - self.times[0] - elapsed) / self.speed
+                time.sleep(min(timeout, max(wait, 0.0)))
+                return self.empty()
+            end = min(end, due)
+
+        batch = self.records[self.position:end]
+        self.position += len(batch)
+        return np.array(batch['time']), np.array(batch['values'], dtype=float)
+
+
+class SyntheticSource(Source):
+    """Generated joint-like motion on every channel, for testing and load testing without hardware.
+
+    Each channel is a slow sine sweep with its own frequency and phase plus
+    Gaussian noise. With ``realtime`` off it produces ``batch_size`` samples per
+    read as fast as they are consumed, still stamped at ``rate``.
+    """
+
+    def __init__(self, num_values=6, rate=100.0, amplitude=45.0, noise=0.5, realtime=True, batch_size=1024, seed=None):
+        self.num_values = num_values
+        self.rate = rate
+        self.amplitude = amplitude
+        self.noise = noise
+        self.realtime = realtime
+        self.batch_size = batch_size
+        self.seed = seed
+        self.description = f"synthetic {num_values} channels at {rate:g}Hz"
+
+    def open(self):
+        self.rng = np.random.default_rng(self.seed)
+        self.frequencies = self.rng.uniform(0.1, 1.0, self.num_values)
+        self.phases = self.rng.uniform(0, 2 * np.pi, self.num_values)
+        self.start_time = time.monotonic()
+        self.count = 0
+
+    def read(self, timeout):
+        due = self.count + self.batch_size
+        if self.realtime:
+            due = min(due, int((time.monotonic() - self.start_time) * self.rate))
+            if due <= self.count:
+                time.sleep(min(timeout, max((self.count + 1) / self.rate - (time.monotonic() - self.start_time), 0.0)))
+                return self.empty()
+
+        timestamps = self.start_time + np.arange(self.count, due) / self.rate
+        self.count = due
+        values = self.amplitude * np.sin(2 * np.pi * self.frequencies * (timestamps - self.start_time)[:, None] + self.phases)
+        values += self.noise * self.rng.standard_normal(values.shape)
+        return timestamps, values
+
+
+class SampleReader:
+    """Publishes an opened Source's samples through ``ring`` as rows of ``[time, values...]``.
+
+    When a ``recorder`` is given every sample is also appended to it.
+    Subclasses decide how the source is serviced and call ``publish``.
+    """
+
+    def __init__(self, source, recorder=None, capacity=8192):
+        self.source = source
+        self.num_values = source.num_values
+        self.recorder = recorder
+        self.ring = RingBuffer(capacity, source.num_values + 1)
+        self.error = None
+        self.description = source.description
+
+    def publish(self, timestamps, samples):
+        if len(samples):
+            self.ring.write(np.column_stack((timestamps, samples)))
+            if self.recorder is not None:
+                self.recorder.write(timestamps, samples)
+
+    def counters(self):
+        """The source's loss counters plus rows the consumer missed because the ring overran."""
+        return {'ring overruns': self.ring.overruns, **self.source.counters()}
+
+    def close(self):
+        """Releases the source and finishes any recording."""
+        self.source.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+
+class SourceReader(SampleReader, threading.Thread):
+    """Reads any Source on its own background thread.
+
+    Sources that are not realtime are only read when the ring has room for a
+    whole batch, so a slow consumer slows them down instead of losing samples.
+    """
+
+    def __init__(self, source, recorder=None, capacity=8192, poll_timeout=0.05):
+        threading.Thread.__init__(self, daemon=True)
+        SampleReader.__init__(self, source, recorder, capacity)
+        self.poll_timeout = poll_timeout
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                if not self.source.realtime and len(self.ring) + min(self.source.batch_size, self.ring.capacity) > self.ring.capacity:
+                    time.sleep(0.001)  # Let the consumer catch up
+                    continue
+                self.publish(*self.source.read(self.poll_timeout))
+        except EOFError:
+            pass
+        except (serial.SerialException, OSError, ValueError) as e:
+            self.error = e
+        finally:
+            self.close()
+
+    def stop(self):
+        """Asks the thread to finish and waits for it to release the source."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class StreamingStats:
+    """Per-channel running statistics over batches of samples, in constant memory.
+
+    Count, minimum, maximum, mean and variance are exact. Each batch's own
+    mean and sum of squared deviations are merged into the running totals
+    with Chan et al.'s parallel form of Welford's algorithm, so a long stream
+    never loses precision to a growing sum of squares. Percentiles come from
+    a fixed-width histogram per channel and are accurate to ``resolution``;
+    values outside ``limits`` count towards the end bins.
+    """
+
+    def __init__(self, num_channels, limits=(-720.0, 720.0), resolution=0.1):
+        self.num_channels = num_channels
+        self.low = limits[0]
+        self.resolution = resolution
+        self.bins = int(np.ceil((limits[1] - limits[0]) / resolution))
+        self.count = 0
+        self.mean = np.zeros(num_channels)
+        self.m2 = np.zeros(num_channels)  # Sum of squared deviations from the mean
+        self.minimum = np.full(num_channels, np.inf)
+        self.maximum = np.full(num_channels, -np.inf)
+        self.histogram = np.zeros((num_channels, self.bins), dtype=np.int64)
+        self._offsets = np.arange(num_channels) * self.bins
+
+    def update(self, samples):
+        """Adds a batch of shape (n, num_channels)."""
+        samples = np.asarray(samples, dtype=float).reshape(-1, self.num_channels)
+        count = len(samples)
+        if count == 0:
+            return
+
+        batch_mean = samples.mean(axis=0)
+        batch_m2 = np.square(samples - batch_mean).sum(axis=0)
+        total = self.count + count
+        delta = batch_mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += batch_m2 + np.square(delta) * self.count * count / total
+        self.count = total
+        self.minimum = np.minimum(self.minimum, samples.min(axis=0))
+        self.maximum = np.maximum(self.maximum, samples.max(axis=0))
+
+        bins = np.clip(((samples - self.low) / self.resolution).astype(np.int64), 0, self.bins - 1)
+        np.add.at(self.histogram.reshape(-1), (bins + self._offsets).ravel(), 1)
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.full(self.num_channels, np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def rms(self):
+        return np.sqrt(np.square(self.mean) + self.variance)
+
+    @property
+    def range(self):
+        return self.maximum - self.minimum
+
+    def percentile(self, q):
+        """Approximate ``q``th percentile of every channel, within one histogram bin."""
+        if self.count == 0:
+            return np.full(self.num_channels, np.nan)
+        cumulative = np.cumsum(self.histogram, axis=1)
+        rank = max(np.ceil(q / 100 * self.count), 1)
+        index = np.argmax(cumulative >= rank, axis=1)
+        value = self.low + (index + 0.5) * self.resolution
+        return np.clip(value, self.minimum, self.maximum)
+
+    def robust_range(self, low=5.0, high=95.0):
+        """Spread between two percentiles, which unlike the full range ignores brief spikes."""
+        return self.percentile(high) - self.percentile(low)